@@ -1,9 +1,25 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
+import numpy as np
+
+import analytics
+import gex
+import greeks
+import implied_vol
+import instrumentation
+import market_data
+import max_pain
+import prefetch
+import put_call
+import put_call_history
+import unusual_activity
+import vol_surface
+import watchlist
+from instrumentation import metrics, stage
 
 # Streamlit app details
 st.set_page_config(page_title="Financial Analysis", layout="wide")
+metrics.start_run()
 
 # Sidebar Inputs
 with st.sidebar:
@@ -12,11 +28,26 @@ with st.sidebar:
     period = st.selectbox("Enter a time frame", ("1D", "5D", "1M", "6M", "YTD", "1Y", "5Y"), index=2)
 
     # Drop-down menu to select data type (Stock data or Options data)
-    data_type = st.selectbox("Select Data Type", ["Stock Data", "Options Data"])
+    data_type = st.selectbox("Select Data Type", ["Stock Data", "Options Data", "Volatility Surface", "Watchlist"])
 
     # Options selection if "Options Data" is selected
     show_options = data_type == "Options Data"
     option_type = st.selectbox("Select Option Type", ("Call", "Put"), index=0) if show_options else None
+    risk_free_rate = st.number_input("Risk-free rate (%)", min_value=0.0, max_value=20.0, value=4.5, step=0.25) / 100 if show_options else None
+
+    # Surface settings if "Volatility Surface" is selected
+    show_surface = data_type == "Volatility Surface"
+    smooth_surface = st.checkbox("SVI smoothing", value=True) if show_surface else False
+    surface_chart = st.radio("Chart", ("Heatmap", "3D"), horizontal=True) if show_surface else None
+
+    # Watchlist settings if "Watchlist" is selected
+    show_watchlist = data_type == "Watchlist"
+    if show_watchlist:
+        watchlist_text = st.text_area("Tickers (comma, space or newline separated)", "AAPL, MSFT, SPY, QQQ, TSLA", height=150)
+        watchlist_expiries = st.slider("Expirations per ticker", min_value=1, max_value=20, value=4)
+        scan_unusual = st.checkbox("Flag unusual options activity")
+
+    show_debug = st.checkbox("Show debug metrics", value=False)
 
 # Helper function to safely format numerical values
 def safe_format(value, decimal_places=2):
@@ -38,13 +69,16 @@ def format_value(value):
 # Fetch and display stock data
 def display_stock_data(ticker, period):
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        with stage("stock.fetch_info"):
+            info = market_data.get_info(ticker)
 
         # Fetch stock history based on selected period
-        history = stock.history(period=period)
+        with stage("stock.fetch_history"):
+            history = market_data.get_history(ticker, period)
 
-        st.line_chart(history["Close"])
+        with stage("stock.render_chart"):
+            st.line_chart(history["Close"])
+        metrics.count("rows.history", len(history))
 
         # Display stock information in columns
         col1, col2, col3 = st.columns(3)
@@ -66,65 +100,226 @@ def display_stock_data(ticker, period):
             ("Enterprise Value", ent_value),
             ("Employees", employees)
         ]
-        df_info = pd.DataFrame(stock_info[1:], columns=stock_info[0])
-        col1.dataframe(df_info, width=400, hide_index=True)
+        with stage("stock.render_info"):
+            df_info = pd.DataFrame(stock_info[1:], columns=stock_info[0])
+            col1.dataframe(df_info, width=400, hide_index=True)
+
+        # Warm the nearest option chains in case the options page is next
+        prefetch.default_prefetcher().after_stock(ticker)
 
     except Exception as e:
         st.error(f"An error occurred: {e}")
 
-# Calculate Put/Call Ratio
-def calculate_put_call_ratio(ticker):
-    stock = yf.Ticker(ticker)
+# Calculate Put/Call Ratio: expiries are fetched concurrently into a put/call
+# accumulator and the running ratio is shown as each one arrives. Returns the
+# accumulator (None on failure) with volume, open interest and premium ratios.
+# Chains that arrive are also stored in `chains` ({expiry: chain}) when given, so
+# other all-expiry views can reuse this fetch
+def calculate_put_call_ratio(ticker, max_workers=market_data.MAX_FETCH_WORKERS, timeout=market_data.FETCH_TIMEOUT,
+                             chains=None):
     try:
-        expiration_dates = stock.options
-        total_calls = 0
-        total_puts = 0
+        expiration_dates = market_data.get_options(ticker)
+        accumulator = put_call.PutCallAccumulator()
+        failed = []
 
-        for exp_date in expiration_dates:
-            option_chain = stock.option_chain(exp_date)
-            total_calls += option_chain.calls['volume'].sum()
-            total_puts += option_chain.puts['volume'].sum()
+        progress = st.progress(0.0, text="Calculating Put/Call Ratio...")
+        partial = st.empty()
+        results = market_data.iter_option_chains(ticker, expiration_dates, max_workers, timeout)
+        for done, (exp_date, option_chain, error) in enumerate(results, start=1):
+            if error is None:
+                accumulator.add(option_chain, exp_date)
+                if chains is not None:
+                    chains[exp_date] = option_chain
+            else:
+                failed.append(exp_date)
+            progress.progress(done / len(expiration_dates),
+                              text=f"Put/Call Ratio: {done} of {len(expiration_dates)} expirations")
+            partial.write(f"**Put/Call Ratio** (so far): {safe_format(accumulator.ratio)}")
+        progress.empty()
+        partial.empty()
 
-        put_call_ratio = total_puts / total_calls if total_calls > 0 else None
-        return put_call_ratio
+        if failed:
+            st.warning(f"Put/Call Ratio uses {accumulator.expirations} of {len(expiration_dates)} expirations; "
+                       f"failed: {', '.join(failed)}")
+        return accumulator
     except Exception as e:
         st.error(f"Error calculating Put/Call Ratio: {e}")
         return None
 
 # Fetch and display options data
-def display_options_data(ticker, option_type):
+def display_options_data(ticker, option_type, risk_free_rate):
     try:
-        stock = yf.Ticker(ticker)
-        expiration_dates = stock.options
+        with stage("options.fetch_expiries"):
+            expiration_dates = market_data.get_options(ticker)
         expiration_date = st.selectbox("Select an expiration date", expiration_dates)
 
         if expiration_date:
-            options_chain = stock.option_chain(expiration_date)
+            with stage("options.fetch_chain"):
+                options_chain = market_data.get_option_chain(ticker, expiration_date)
+                spot = market_data.get_spot(ticker)
             options_data = options_chain.calls if option_type == "Call" else options_chain.puts
+            metrics.count("rows.options_chain", len(options_data))
 
-            # Calculate Open Interest, and sort by volume
-            options_data['OI'] = options_data['openInterest']
-            options_data = options_data.sort_values(by="volume", ascending=False)
+            # Sorted by volume, with Greeks and IV recomputed as a cross-check on Yahoo's figure
+            options_data = analytics.options_table(options_data, spot, expiration_date, option_type == "Call",
+                                                   risk_free_rate)
 
-            # Display the top options with the highest volume
-            st.write(f"**{option_type}s for {expiration_date} - Top Options by Volume**")
-            st.dataframe(options_data[['contractSymbol', 'strike', 'lastPrice', 'volume', 'impliedVolatility', 'OI']], height=400)
+            # Display the top options with the highest volume, with max pain for this expiry alongside
+            table_column, pain_column = st.columns([3, 1])
+            with stage("options.render_table"), table_column:
+                st.write(f"**{option_type}s for {expiration_date} - Top Options by Volume**")
+                st.dataframe(options_data[['contractSymbol', 'strike', 'lastPrice', 'volume', 'impliedVolatility', 'iv_calc', 'OI']
+                                          + greeks.GREEK_COLUMNS], height=400)
+            with stage("options.max_pain"), pain_column:
+                payout = max_pain.holder_payout(options_chain)
+                st.metric("Max pain", safe_format(payout.idxmin() if len(payout) else None),
+                          help="Settlement strike at which option holders collect the least")
+                st.line_chart(payout, height=300)
+            iv_summary = implied_vol.convergence_summary(options_data)
+            st.caption(f"Recomputed IV converged for {iv_summary['converged']} of {iv_summary['contracts']} contracts "
+                       f"(mean {safe_format(iv_summary['mean_iterations'], 1)} iterations)")
 
             if not options_data.empty:
                 highest_option = options_data.iloc[0]
                 st.write(f"**Highest Volume {option_type} Option**: {highest_option['contractSymbol']} - Volume: {highest_option['volume']}")
 
             # Calculate and display the Put/Call Ratio
-            put_call_ratio = calculate_put_call_ratio(ticker)
-            if put_call_ratio is not None:
-                st.write(f"**Put/Call Ratio**: {safe_format(put_call_ratio)}")
+            chains = {}
+            with stage("options.put_call_ratio"):
+                put_call_ratios = calculate_put_call_ratio(ticker, chains=chains)
+            if put_call_ratios is not None:
+                ratios = put_call_ratios.ratios()
+                st.write(f"**Put/Call Ratio**: {safe_format(ratios['volume'])} by volume, "
+                         f"{safe_format(ratios['open_interest'])} by open interest, "
+                         f"{safe_format(ratios['premium'])} by premium")
+                st.dataframe(put_call_ratios.per_expiry(), hide_index=True, height=250)
+
+                # Keep every computed ratio and chart the past year of them
+                with stage("options.put_call_history"):
+                    symbol = market_data.normalize_ticker(ticker)
+                    put_call_history.record_ratios(symbol, ratios, put_call_ratios.expirations)
+                    samples = put_call_history.ticker_history(
+                        symbol, start=pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=365))
+                if samples is not None and len(samples) > 1:
+                    st.write("**Put/Call Ratio History** (past year)")
+                    st.line_chart(samples.set_index("ts")[put_call.RATIO_KINDS], height=250)
+
+            # Open interest and max pain across every expiration, from the same fetch
+            if chains:
+                chains = {exp: chains[exp] for exp in expiration_dates if exp in chains}
+                with stage("options.oi_profile"):
+                    profile = max_pain.oi_profile(chains)
+                    pain_table = max_pain.max_pain_table(chains)
+                st.write("**Open Interest by Strike (all expirations)**")
+                st.bar_chart(profile, height=300)
+                st.dataframe(pain_table, hide_index=True, height=250)
+
+                # Dealer gamma exposure across the full chain, from the same fetch
+                with stage("options.gex"):
+                    exposure = gex.gamma_exposure(ticker, chains, spot, risk_free_rate)
+                st.write("**Dealer Gamma Exposure by Strike** (USD per 1% move)")
+                st.bar_chart(exposure.by_strike["net_gex"], height=300)
+                st.write(f"**Net Gamma Exposure**: {safe_format(exposure.total / 1e9, 3)} USD bn per 1% move - "
+                         f"**Zero-Gamma Flip**: {safe_format(exposure.flip)}")
+
+            # Warm the neighbouring expirations and the stock page while this one is read
+            prefetch.default_prefetcher().after_options(ticker, expiration_dates, expiration_date, period)
 
     except Exception as e:
         st.error(f"An error occurred while fetching options data: {e}")
 
+# Build and plot the implied volatility surface across all expirations
+def display_volatility_surface(ticker, smooth, chart):
+    # matplotlib is only needed by this page, so it is not loaded at startup
+    import matplotlib.pyplot as plt
+
+    try:
+        with stage("surface.build"):
+            surface = vol_surface.get_surface(ticker, smooth=smooth)
+        days = surface.t * 365
+        strike_ratio = np.exp(surface.moneyness)
+
+        if chart == "3D":
+            fig = plt.figure(figsize=(10, 6))
+            ax = fig.add_subplot(projection="3d")
+            x, y = np.meshgrid(strike_ratio, days)
+            ax.plot_surface(x, y, surface.iv, cmap="viridis")
+            ax.set_zlabel("Implied volatility")
+        else:
+            fig, ax = plt.subplots(figsize=(10, 6))
+            mesh = ax.pcolormesh(strike_ratio, days, surface.iv, cmap="viridis", shading="auto")
+            fig.colorbar(mesh, ax=ax, label="Implied volatility")
+        ax.set_xlabel("Strike / spot")
+        ax.set_ylabel("Days to expiration")
+        ax.set_title(f"{surface.ticker} implied volatility surface (spot {safe_format(surface.spot)})")
+        with stage("surface.render"):
+            st.pyplot(fig)
+        plt.close(fig)
+
+        st.write(f"**Built from {len(surface.points)} out-of-the-money quotes across "
+                 f"{surface.points['expiration'].nunique()} expirations**")
+        st.dataframe(vol_surface.surface_frame(surface), height=300)
+
+    except Exception as e:
+        st.error(f"An error occurred while building the volatility surface: {e}")
+
+# Scan a list of tickers concurrently, streaming each summary into the table as it completes
+def display_watchlist(tickers, max_expiries, scan_unusual):
+    if not tickers:
+        st.info("Enter at least one ticker to scan.")
+        return
+
+    progress = st.progress(0.0, text=f"Scanning {len(tickers)} tickers...")
+    table = st.empty()
+    rows, frames = [], []
+    metrics.count("watchlist.tickers", len(tickers))
+    with stage("watchlist.scan"):
+        for summary, frame in watchlist.scan_watchlist(tickers, max_expiries=max_expiries,
+                                                       with_frames=scan_unusual):
+            rows.append(summary)
+            frames.append(frame)
+            progress.progress(len(rows) / len(tickers), text=f"Scanned {len(rows)} of {len(tickers)} tickers")
+            table.dataframe(pd.DataFrame(rows, columns=watchlist.SUMMARY_COLUMNS), hide_index=True, height=500)
+    progress.empty()
+
+    failed = [row["ticker"] for row in rows if row["error"]]
+    if failed:
+        st.warning(f"No data for: {', '.join(failed)}")
+
+    # Unusual activity across every scanned contract, flagged from the chains the scan
+    # above already fetched rather than fetching the market a second time
+    if scan_unusual:
+        with st.spinner("Scanning for unusual options activity..."), stage("watchlist.unusual"):
+            flagged = unusual_activity.flag_frames(frames, tickers)
+        st.write(f"**Unusual Options Activity** ({len(flagged)} contracts: volume/OI above "
+                 f"{unusual_activity.VOLUME_OI_RATIO:g}, volume above {unusual_activity.BASELINE_MULTIPLE:g}x "
+                 f"its stored baseline, or premium above {format_value(unusual_activity.MIN_PREMIUM)})")
+        st.dataframe(flagged, hide_index=True, height=400)
+
 # Display data based on the selected type
-if ticker.strip():
+if show_watchlist:
+    display_watchlist(watchlist.parse_tickers(watchlist_text), watchlist_expiries, scan_unusual)
+elif ticker.strip():
     if data_type == "Stock Data":
         display_stock_data(ticker, period)
     elif data_type == "Options Data" and show_options:
-        display_options_data(ticker, option_type)
+        display_options_data(ticker, option_type, risk_free_rate)
+    elif show_surface:
+        display_volatility_surface(ticker, smooth_surface, surface_chart)
+
+# Optional debug panel: where this run spent its time, process-wide timers and
+# counters, cache behaviour, and a machine-readable dump of all of it
+metrics_data = instrumentation.collect({"cache": market_data.cache_stats()})
+instrumentation.dump(metrics_data)
+if show_debug:
+    with st.sidebar.expander("Debug metrics", expanded=True):
+        st.write("**This run**")
+        st.dataframe(pd.DataFrame(metrics_data["last_run"], columns=["stage", "ms"]), hide_index=True)
+        st.write("**Stage timers (process)**")
+        st.dataframe(instrumentation.timer_table(metrics_data), hide_index=True)
+        st.write("**Counters**")
+        st.json(metrics_data["counters"], expanded=False)
+        st.write("**Cache**")
+        st.json(metrics_data["cache"], expanded=False)
+        st.download_button("Download metrics JSON", instrumentation.to_json(metrics_data),
+                           file_name="options_app_metrics.json", mime="application/json")
@@ -0,0 +1,87 @@
+import pandas as pd
+
+import gex
+import greeks
+import implied_vol
+import market_data
+import max_pain
+import put_call
+from instrumentation import stage
+
+REPORT_SUMMARY_COLUMNS = ["ticker", "spot", "expirations", "volume_ratio", "open_interest_ratio", "premium_ratio",
+                          "nearest_max_pain", "net_gex", "gamma_flip", "contracts", "failed_expirations"]
+
+
+# Open interest renamed to OI for display, busiest contracts first
+def sort_by_volume(options_data):
+    return options_data.rename(columns={"openInterest": "OI"}).sort_values(by="volume", ascending=False)
+
+
+# One side of one expiry as the options page shows it: open interest renamed to OI
+# (a rename, not a copy), sorted by volume, with Black-Scholes Greeks and IV
+# recomputed from the bid/ask midpoint
+def options_table(options_data, spot, expiration_date, is_call, rate, now=None):
+    with stage("options.sort"):
+        options_data = sort_by_volume(options_data)
+    t = greeks.time_to_expiry(expiration_date, now=now)
+    with stage("options.greeks"):
+        options_data = greeks.add_greeks(options_data, spot, t, is_call, rate)
+    with stage("options.implied_vol"):
+        options_data = implied_vol.add_implied_vol(options_data, spot, t, is_call, rate)
+    return options_data
+
+
+# Every contract of every expiry ({expiry: chain}) with Greeks and recomputed IV
+def all_contracts(chains, spot, rate, now=None):
+    contracts = market_data.chain_frame(chains)
+    if contracts.empty:
+        return contracts
+    expiries = contracts["expiration"].unique()
+    t_by_expiry = dict(zip(expiries, greeks.time_to_expiry(list(expiries), now=now)))
+    t = contracts["expiration"].map(t_by_expiry).to_numpy(dtype=float)
+    is_call = contracts["is_call"].to_numpy(dtype=bool)
+    contracts = greeks.add_greeks(contracts, spot, t, is_call, rate)
+    return implied_vol.add_implied_vol(contracts, spot, t, is_call, rate)
+
+
+# Everything the options page derives for a ticker, without any rendering: the
+# enriched contracts, put/call ratios, max pain, open interest and gamma exposure
+# over the nearest max_expiries expirations (all when None). Returns a dict of
+# DataFrames plus a one-row "summary" dict keyed by REPORT_SUMMARY_COLUMNS.
+# Expirations that fail are left out and listed in the summary's
+# failed_expirations; only a ticker with no chains at all raises.
+def ticker_report(ticker, rate, max_expiries=None, now=None):
+    ticker = market_data.normalize_ticker(ticker)
+    spot = market_data.get_spot(ticker)
+    expiration_dates = market_data.get_options(ticker)[:max_expiries]
+    chains, failed = market_data.fetch_option_chains(ticker, expiration_dates)
+    if not chains:
+        raise RuntimeError(f"all {len(expiration_dates)} expirations failed" if failed else "no expirations")
+
+    ratios, ratios_by_expiry = put_call.ratio_summary(chains)
+    pain_table = max_pain.max_pain_table(chains)
+    exposure = gex.gamma_exposure(ticker, chains, spot, rate, now=now)
+    contracts = all_contracts(chains, spot, rate, now=now)
+    summary = {
+        "ticker": ticker,
+        "spot": spot,
+        "expirations": len(chains),
+        **{f"{kind}_ratio": value for kind, value in ratios.items()},
+        "nearest_max_pain": pain_table["max_pain"].iloc[0] if len(pain_table) else None,
+        "net_gex": exposure.total,
+        "gamma_flip": exposure.flip,
+        "contracts": len(contracts),
+        "failed_expirations": ", ".join(exp for exp in expiration_dates if exp in failed),
+    }
+    return {
+        "summary": summary,
+        "contracts": contracts,
+        "put_call": ratios_by_expiry,
+        "max_pain": pain_table,
+        "oi_profile": max_pain.oi_profile(chains).reset_index(),
+        "gex": exposure.by_strike.reset_index(),
+    }
+
+
+def summary_frame(summaries):
+    return pd.DataFrame(summaries, columns=REPORT_SUMMARY_COLUMNS)
@@ -0,0 +1,242 @@
+# Optional local JSON API over the same data and analytics as the Streamlit app.
+#
+# A small asyncio HTTP/1.1 server (standard library only). Handlers call the
+# blocking market_data / analytics functions on a thread pool, so they share the
+# app's fetch cache and snapshot store, and identical requests that arrive while
+# one is in flight wait for that one instead of starting their own.
+#
+# Usage: python api_server.py [--host 127.0.0.1] [--port 8765]
+#
+# Endpoints (GET, JSON responses):
+#   /health
+#   /info/<ticker>
+#   /history/<ticker>?period=1mo
+#   /options/<ticker>                       expiration dates
+#   /chain/<ticker>/<expiry>?side=calls     calls, puts or both
+#   /put_call/<ticker>?expiries=N           ratios in aggregate and per expiry
+#   /greeks/<ticker>/<expiry>?side=call&rate=4.5   call, put or both
+#   /metrics                                stage timers, counters and cache stats
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import analytics
+import instrumentation
+import market_data
+import put_call
+from instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 16
+# Requests larger than this (request line plus headers) are refused
+MAX_HEADER_BYTES = 16 * 1024
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 30.0
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           431: "Request Header Fields Too Large", 502: "Bad Gateway"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Concurrent callers of the same key share one execution of fn on the executor
+class Coalescer:
+    def __init__(self, executor):
+        self.executor = executor
+        self._inflight = {}
+
+    async def run(self, key, fn):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, fn)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            metrics.count("api.coalesced")
+        # shield: one client disconnecting must not cancel the fetch others wait on
+        return await asyncio.shield(future)
+
+
+def _records(frame):
+    return json.loads(frame.to_json(orient="records", date_format="iso"))
+
+
+def _side(query, default):
+    side = query.get("side", default).lower()
+    if side not in ("call", "calls", "put", "puts", "both"):
+        raise HTTPError(400, f"side must be calls, puts or both, not {side!r}")
+    return side
+
+
+def _number(query, name, default, kind=float):
+    try:
+        return kind(query[name]) if name in query else default
+    except ValueError:
+        raise HTTPError(400, f"{name} must be a number") from None
+
+
+def _info(ticker, query):
+    return market_data.get_info(ticker)
+
+
+def _history(ticker, query):
+    history = market_data.get_history(ticker, query.get("period", "1mo"))
+    return _records(history.reset_index())
+
+
+def _options(ticker, query):
+    return list(market_data.get_options(ticker))
+
+
+def _chain(ticker, expiry, query):
+    side = _side(query, "both")
+    chain = market_data.get_option_chain(ticker, expiry)
+    result = {}
+    if side != "put" and side != "puts":
+        result["calls"] = _records(chain.calls)
+    if side != "call" and side != "calls":
+        result["puts"] = _records(chain.puts)
+    return result
+
+
+def _put_call(ticker, query):
+    expiration_dates = market_data.get_options(ticker)[:_number(query, "expiries", None, int)]
+    chains, failed = market_data.fetch_option_chains(ticker, expiration_dates)
+    ratios, per_expiry = put_call.ratio_summary(chains)
+    return {"ratios": ratios, "per_expiry": _records(per_expiry), "failed": sorted(failed)}
+
+
+# A list of rows for one side; {"calls": ..., "puts": ...} like /chain for both
+def _greeks(ticker, expiry, query):
+    side = _side(query, "call")
+    rate = _number(query, "rate", 4.5) / 100
+    chain = market_data.get_option_chain(ticker, expiry)
+    spot = market_data.get_spot(ticker)
+    tables = {}
+    if side != "put" and side != "puts":
+        tables["calls"] = _records(analytics.options_table(chain.calls, spot, expiry, True, rate))
+    if side != "call" and side != "calls":
+        tables["puts"] = _records(analytics.options_table(chain.puts, spot, expiry, False, rate))
+    return tables if side == "both" else next(iter(tables.values()))
+
+
+def _metrics(query):
+    return instrumentation.collect({"cache": market_data.cache_stats()})
+
+
+# path prefix -> (number of path arguments after it, handler)
+ROUTES = {
+    "info": (1, _info),
+    "history": (1, _history),
+    "options": (1, _options),
+    "chain": (2, _chain),
+    "put_call": (1, _put_call),
+    "greeks": (2, _greeks),
+    "metrics": (0, _metrics),
+}
+
+
+class APIServer:
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api")
+        self.coalescer = Coalescer(self.executor)
+
+    # Route a GET to its handler; returns a JSON-ready value
+    async def dispatch(self, target):
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if parts == ["health"]:
+            return {"status": "ok"}
+        if not parts or parts[0] not in ROUTES or len(parts) - 1 != ROUTES[parts[0]][0]:
+            raise HTTPError(404, f"no such endpoint: {url.path}")
+        name, args = parts[0], parts[1:]
+        if args:
+            args[0] = market_data.normalize_ticker(args[0])
+        handler = ROUTES[name][1]
+        key = (name, *args, tuple(sorted(query.items())))
+        metrics.count(f"api.requests.{name}")
+        try:
+            with metrics.stage(f"api.{name}"):
+                return await self.coalescer.run(key, lambda: handler(*args, query))
+        except HTTPError:
+            raise
+        except Exception as e:
+            raise HTTPError(502, f"{type(e).__name__}: {e}") from e
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, default=str).encode()
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {"error": "request headers too large"}, False)
+                    return
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                request_line = lines[0].split()
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and request_line[-1:] == ["HTTP/1.1"]
+
+                if len(request_line) != 3:
+                    status, payload, keep_alive = 400, {"error": "malformed request line"}, False
+                elif request_line[0] != "GET":
+                    status, payload = 405, {"error": "only GET is supported"}
+                else:
+                    try:
+                        status, payload = 200, await self.dispatch(request_line[1])
+                    except HTTPError as e:
+                        status, payload = e.status, {"error": str(e)}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        for sock in server.sockets:
+            logger.info("Serving on http://%s:%s", *sock.getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local JSON API for the options analytics")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(APIServer(args.workers).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
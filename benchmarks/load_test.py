@@ -0,0 +1,70 @@
+# Hammer the market_data layer from many threads against the offline replay
+# backend and report throughput, latency and cache behaviour.
+# Usage: python benchmarks/load_test.py FIXTURES_DIR [--threads 32] [--seconds 10] [--latency 0.05]
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import market_data  # noqa: E402
+import providers  # noqa: E402
+import snapshot_store  # noqa: E402
+
+
+def worker(tickers, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        ticker = rng.choice(tickers)
+        start = time.perf_counter()
+        try:
+            kind = rng.random()
+            if kind < 0.2:
+                market_data.get_info(ticker)
+            elif kind < 0.4:
+                market_data.get_history(ticker, rng.choice(["1D", "1M", "1Y"]))
+            else:
+                market_data.get_option_chain(ticker, rng.choice(market_data.get_options(ticker)))
+        except Exception:
+            errors.append(1)
+        latencies.append(time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test market_data against replay fixtures")
+    parser.add_argument("fixtures")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated upstream latency per call")
+    args = parser.parse_args()
+
+    # Measure the cache and fetch path, not Parquet writes
+    snapshot_store.SNAPSHOT_DIR = ""
+    market_data.set_provider(providers.ReplayProvider(args.fixtures, latency=args.latency))
+    tickers = sorted(os.listdir(args.fixtures))
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=worker, args=(tickers, deadline, latencies, errors, i))
+               for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ms = np.array(latencies) * 1e3
+    stats = market_data.cache_stats()
+    flight = stats["singleflight"]
+    stats = stats["cache"]
+    print(f"{len(ms)} requests in {args.seconds:.0f}s ({len(ms) / args.seconds:,.0f} req/s), {len(errors)} errors")
+    print(f"latency p50 {np.percentile(ms, 50):.3f} ms  p99 {np.percentile(ms, 99):.3f} ms  max {ms.max():.1f} ms")
+    print(f"cache hit rate {stats['hit_rate']:.1%}  misses {stats['misses']}")
+    print(f"upstream fetches {flight['leaders']}  concurrent misses coalesced {flight['shared']}")
+
+
+if __name__ == "__main__":
+    main()
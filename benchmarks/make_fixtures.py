@@ -0,0 +1,109 @@
+# Write deterministic synthetic market data in the ReplayProvider layout, for
+# offline benchmarks and load tests.
+# Usage: python benchmarks/make_fixtures.py OUT_DIR [--tickers AAPL SPY] [--expiries 12] [--strikes 80]
+import argparse
+import os
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import greeks  # noqa: E402
+import providers  # noqa: E402
+
+HISTORY_PERIODS = ["1d", "5d", "1mo", "6mo", "ytd", "1y", "5y",
+                   "1D", "5D", "1M", "6M", "YTD", "1Y", "5Y"]
+AS_OF = pd.Timestamp("2026-10-16 20:00", tz="UTC")
+
+
+# Option chains priced with Black-Scholes off a smile, so Greeks/IV code has sane inputs
+class SyntheticProvider(providers.MarketDataProvider):
+    name = "synthetic"
+
+    def __init__(self, n_expiries=12, n_strikes=80):
+        self.n_expiries = n_expiries
+        self.n_strikes = n_strikes
+
+    def _rng(self, *parts):
+        return np.random.default_rng(zlib.crc32("|".join(parts).encode()))
+
+    def _spot(self, ticker):
+        return float(self._rng(ticker, "spot").uniform(20, 600))
+
+    def history(self, ticker, period):
+        rng = self._rng(ticker, "history", period)
+        index = pd.bdate_range(end=AS_OF.normalize(), periods=260)
+        # Random walk that ends at the ticker's spot price
+        walk = np.cumsum(rng.normal(0, 0.015, len(index)))
+        close = self._spot(ticker) * np.exp(walk - walk[-1])
+        return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                             "Close": close, "Volume": rng.integers(1e5, 1e7, len(index))}, index=index)
+
+    def info(self, ticker):
+        rng = self._rng(ticker, "info")
+        return {"symbol": ticker, "country": "United States", "sector": "Technology",
+                "industry": "Software", "marketCap": float(rng.uniform(1e9, 3e12)),
+                "enterpriseValue": float(rng.uniform(1e9, 3e12)),
+                "fullTimeEmployees": int(rng.integers(100, 200_000)),
+                "currentPrice": self._spot(ticker)}
+
+    def options(self, ticker):
+        first = AS_OF.normalize().tz_localize(None) + pd.offsets.Week(weekday=4)
+        return tuple(d.strftime("%Y-%m-%d") for d in pd.date_range(first, periods=self.n_expiries, freq="W-FRI"))
+
+    def option_chain(self, ticker, expiration_date):
+        rng = self._rng(ticker, "chain", expiration_date)
+        spot = self._spot(ticker)
+        strike = np.round(np.linspace(0.6, 1.4, self.n_strikes) * spot, 1)
+        t = greeks.time_to_expiry(expiration_date, now=AS_OF)
+
+        def side(is_call):
+            vol = 0.25 + 0.4 * np.log(strike / spot) ** 2 + rng.normal(0, 0.01, len(strike))
+            price = greeks.black_scholes_price(spot, strike, t, 0.045, vol, is_call)
+            spread = np.maximum(price * 0.02, 0.01)
+            volume = rng.integers(0, 5000, len(strike)).astype(float)
+            volume[rng.random(len(strike)) < 0.1] = np.nan
+            letter = "C" if is_call else "P"
+            return pd.DataFrame({
+                "contractSymbol": [f"{ticker}{expiration_date[2:].replace('-', '')}{letter}{int(k * 1000):08d}"
+                                   for k in strike],
+                "lastTradeDate": AS_OF,
+                "strike": strike,
+                "lastPrice": np.round(price, 2),
+                "bid": np.round(np.maximum(price - spread, 0), 2),
+                "ask": np.round(price + spread, 2),
+                "change": 0.0,
+                "percentChange": 0.0,
+                "volume": volume,
+                "openInterest": rng.integers(0, 50_000, len(strike)).astype(float),
+                "impliedVolatility": vol,
+                "inTheMoney": strike < spot if is_call else strike > spot,
+                "contractSize": "REGULAR",
+                "currency": "USD",
+            })
+
+        return providers.OptionChain(calls=side(True), puts=side(False), underlying=None)
+
+
+def write_fixtures(root, tickers, n_expiries=12, n_strikes=80):
+    recorder = providers.RecordingProvider(SyntheticProvider(n_expiries, n_strikes), root)
+    for ticker in tickers:
+        recorder.info(ticker)
+        for period in HISTORY_PERIODS:
+            recorder.history(ticker, period)
+        for expiration_date in recorder.options(ticker):
+            recorder.option_chain(ticker, expiration_date)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic replay fixtures")
+    parser.add_argument("out_dir")
+    parser.add_argument("--tickers", nargs="+", default=["AAPL", "MSFT", "SPY", "QQQ", "TSLA"])
+    parser.add_argument("--expiries", type=int, default=12)
+    parser.add_argument("--strikes", type=int, default=80)
+    args = parser.parse_args()
+    write_fixtures(args.out_dir, args.tickers, args.expiries, args.strikes)
+    print(f"Wrote fixtures for {len(args.tickers)} tickers to {args.out_dir}")
@@ -0,0 +1,173 @@
+# Offline benchmark suite for the data-fetch, analytics and render paths.
+#
+# Generates deterministic replay fixtures for a small and a large chain, times
+# every stage of the stock and options pages against them, and compares the
+# results with benchmarks/baseline.json.
+#
+# Usage:
+#   python benchmarks/run_benchmarks.py                   compare against the baseline
+#   python benchmarks/run_benchmarks.py --save-baseline   record a new baseline
+#   python benchmarks/run_benchmarks.py --json out.json   also write raw results
+#
+# Exits with status 1 when any stage is slower than --tolerance x its baseline
+# and by more than --min-delta milliseconds (sub-millisecond stages are noisy).
+# Baselines are machine-specific; re-record them on the machine you compare on.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from streamlit import dataframe_util
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics  # noqa: E402
+import gex  # noqa: E402
+import greeks  # noqa: E402
+import implied_vol  # noqa: E402
+import market_data  # noqa: E402
+import max_pain  # noqa: E402
+import providers  # noqa: E402
+import put_call  # noqa: E402
+import snapshot_store  # noqa: E402
+import vol_surface  # noqa: E402
+from make_fixtures import AS_OF, write_fixtures  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# (expirations, strikes per side) for each chain size
+SIZES = {"small": (4, 40), "large": (30, 200)}
+TICKER = "BENCH"
+RATE = 0.045
+TABLE_COLUMNS = ["contractSymbol", "strike", "lastPrice", "volume", "impliedVolatility", "OI"]
+
+
+def best_of(fn, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# Every stage for one chain size; returns {stage: seconds}
+def run_size(root, repeat):
+    provider = providers.ReplayProvider(root)
+    market_data.set_provider(provider)
+    expiration_dates = provider.options(TICKER)
+    results = {}
+
+    def cold_fetch():
+        market_data.fetch_option_chains(TICKER, expiration_dates)
+
+    results["fetch_chains_cold"] = best_of(cold_fetch, repeat, setup=market_data.clear_cache)
+    results["fetch_chains_cached"] = best_of(cold_fetch, repeat)
+
+    def stock_fetch():
+        market_data.get_info(TICKER)
+        market_data.get_history(TICKER, "1y")
+
+    results["fetch_stock_cold"] = best_of(stock_fetch, repeat, setup=market_data.clear_cache)
+
+    chains, _ = market_data.fetch_option_chains(TICKER, expiration_dates)
+    first = chains[expiration_dates[0]].calls
+    spot = float(provider.history(TICKER, "1d")["Close"].iloc[-1])
+
+    # The rename and sort analytics.options_table runs before computing Greeks
+    results["sort_by_volume"] = best_of(lambda: analytics.sort_by_volume(first), repeat)
+
+    # One frame holding every contract of every expiry, as the all-expiry analytics see it
+    everything = market_data.chain_frame(chains)
+    t = np.asarray(greeks.time_to_expiry(everything["expiration"].to_numpy(), now=AS_OF))
+    is_call = everything["is_call"].to_numpy()
+
+    results["greeks_all_expiries"] = best_of(
+        lambda: greeks.add_greeks(everything, spot, t, is_call, RATE), repeat)
+    results["implied_vol_all_expiries"] = best_of(
+        lambda: implied_vol.add_implied_vol(everything, spot, t, is_call, RATE), repeat)
+    results["put_call_ratio"] = best_of(lambda: put_call.ratio_summary(chains), repeat)
+    results["max_pain_all_expiries"] = best_of(
+        lambda: (max_pain.max_pain_table(chains), max_pain.oi_profile(chains)), repeat)
+    results["gex_all_expiries"] = best_of(
+        lambda: gex.gamma_exposure(TICKER, chains, spot, RATE, now=AS_OF), repeat)
+    results["vol_surface_smoothed"] = best_of(
+        lambda: vol_surface.build_surface(TICKER, chains, spot, smooth=True, now=AS_OF), repeat)
+
+    # Table construction: the displayed column subset, serialized the way st.dataframe ships it
+    table = greeks.add_greeks(first.rename(columns={"openInterest": "OI"}), spot, t[0], True, RATE)
+    results["table_construction"] = best_of(
+        lambda: dataframe_util.convert_pandas_df_to_arrow_bytes(
+            table.sort_values(by="volume", ascending=False)[TABLE_COLUMNS + greeks.GREEK_COLUMNS]), repeat)
+    results["contracts"] = len(everything)
+    return results
+
+
+def run(repeat):
+    # Snapshots would turn cold fetches into disk reads of earlier runs
+    snapshot_store.SNAPSHOT_DIR = ""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size, (n_expiries, n_strikes) in SIZES.items():
+            root = os.path.join(tmp, size)
+            write_fixtures(root, [TICKER], n_expiries, n_strikes)
+            results[size] = run_size(root, repeat)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta):
+    regressions = []
+    print(f"{'stage':<28}{'size':<8}{'ms':>10}{'baseline':>12}{'ratio':>8}")
+    for size, stages in results.items():
+        for stage, seconds in stages.items():
+            if stage == "contracts":
+                continue
+            base = baseline.get(size, {}).get(stage)
+            ratio = seconds / base if base else float("nan")
+            flag = ""
+            if base and ratio > tolerance and seconds - base > min_delta:
+                flag = "  REGRESSION"
+                regressions.append((size, stage, ratio))
+            base_text = f"{base * 1e3:10.3f}" if base else f"{'-':>10}"
+            print(f"{stage:<28}{size:<8}{seconds * 1e3:10.3f}  {base_text}{ratio:8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="flag stages slower than this multiple of the baseline")
+    parser.add_argument("--min-delta", type=float, default=0.5,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", help="write raw results to this file")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta / 1e3)
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than {args.tolerance}x baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
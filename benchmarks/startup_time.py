@@ -0,0 +1,67 @@
+# Measure the cold-start import cost of Options_app.py.
+#
+# Runs the app's top-level import statements (parsed from the script, so the
+# page itself is not executed) in fresh interpreters and reports the median
+# wall time plus which heavy optional modules were loaded by those imports.
+# --eager additionally imports every heavy module up front, which is what the
+# app paid on every cold start before imports were deferred.
+#
+# Usage: python benchmarks/startup_time.py [--runs 7] [--eager]
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "Options_app.py")
+
+# pandas imports pyarrow itself when installed, so the dataset layer is what counts
+HEAVY_MODULES = ["yfinance", "scipy", "matplotlib", "pyarrow.dataset", "pandas", "numpy"]
+EAGER_IMPORTS = ["yfinance", "scipy.special", "scipy.optimize", "matplotlib.pyplot",
+                 "pyarrow.dataset", "pyarrow.parquet"]
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def app_imports():
+    with open(APP) as f:
+        tree = ast.parse(f.read())
+    nodes = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in nodes)
+
+
+def measure(runs, eager):
+    imports = app_imports()
+    if eager:
+        imports += "\n" + "\n".join(f"import {name}" for name in EAGER_IMPORTS)
+    probe = _PROBE.format(root=ROOT, imports=imports, heavy=HEAVY_MODULES)
+    samples = []
+    loaded = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        loaded = result["loaded"]
+    return statistics.median(samples), loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure Options_app.py import time")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--eager", action="store_true", help="also import every heavy module up front")
+    args = parser.parse_args()
+
+    seconds, loaded = measure(args.runs, args.eager)
+    label = "eager" if args.eager else "as shipped"
+    print(f"{label}: median {seconds * 1e3:.0f} ms over {args.runs} runs; heavy modules loaded: {', '.join(loaded) or 'none'}")
@@ -0,0 +1,380 @@
+# Shared second-level cache for fetched responses, so several app processes (or
+# Streamlit replicas) share one warm cache instead of each starting cold.
+#
+# OPTIONS_APP_CACHE_BACKEND picks the store:
+#   sqlite:///cache.db           one file on local disk, read through mmap
+#                                (sqlite:////abs/path.db for an absolute path)
+#   redis://host:6379/0          any Redis-protocol server
+# and is empty (off) by default. Values are serialized without pickle: DataFrames
+# and option chains as Arrow IPC streams, everything else as JSON.
+#
+# `python cache_backend.py serve --port 6380` runs a small in-memory stand-in
+# that speaks enough of the Redis protocol for this module, for tests and
+# single-host setups without a real Redis.
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import struct
+import threading
+import time
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from providers import OptionChain
+
+CACHE_BACKEND = os.environ.get("OPTIONS_APP_CACHE_BACKEND", "")
+
+# Bytes of the SQLite file mapped into memory for reads
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+REDIS_TIMEOUT = 2.0
+
+_FRAME, _CHAIN, _JSON = b"F", b"C", b"J"
+# Bumped whenever serialize() changes, so old and new processes never read each other's values
+FORMAT_VERSION = 1
+
+
+class CacheBackendError(Exception):
+    pass
+
+
+# Keys are namespaced by format version and provider name, so a replay or benchmark
+# process sharing the backend never serves its synthetic data under live ticker keys
+def encode_key(namespace, key):
+    return "|".join(str(part) for part in (f"v{FORMAT_VERSION}", namespace, *key))
+
+
+def _frame_bytes(frame):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _read_frame(data):
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(pa.py_buffer(data)).read_all().to_pandas()
+
+
+# Anything with calls and puts frames: the repo's OptionChain, yfinance's own
+# Options namedtuple, or a chain compacted with _replace (which keeps the class)
+def _is_chain(value):
+    return isinstance(getattr(value, "calls", None), pd.DataFrame) and \
+        isinstance(getattr(value, "puts", None), pd.DataFrame)
+
+
+# Leftovers such as timestamps in info dicts become strings; pandas objects must
+# never be flattened into their repr
+def _json_default(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)) or _is_chain(value):
+        raise TypeError(f"{type(value).__name__} can't be stored as JSON")
+    return str(value)
+
+
+# Tagged bytes for a DataFrame, an option chain (calls and puts, length-prefixed)
+# or any JSON-serializable value; tuples come back as lists. Raises TypeError
+# for values holding frames in any other shape.
+def serialize(value):
+    if isinstance(value, pd.DataFrame):
+        return _FRAME + _frame_bytes(value)
+    if _is_chain(value):
+        calls = _frame_bytes(value.calls)
+        return _CHAIN + struct.pack("<Q", len(calls)) + calls + _frame_bytes(value.puts)
+    return _JSON + json.dumps(value, default=_json_default).encode()
+
+
+def deserialize(data):
+    tag, body = data[:1], data[1:]
+    if tag == _FRAME:
+        return _read_frame(body)
+    if tag == _CHAIN:
+        (size,) = struct.unpack_from("<Q", body)
+        return OptionChain(calls=_read_frame(body[8:8 + size]), puts=_read_frame(body[8 + size:]), underlying=None)
+    if tag == _JSON:
+        return json.loads(body)
+    raise CacheBackendError(f"unknown value tag {tag!r}")
+
+
+# Shared store in one SQLite file. WAL lets readers in other processes run
+# alongside a writer, and reads go through a memory map of the file.
+class SQLiteBackend:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+            connection.execute("CREATE TABLE IF NOT EXISTS cache "
+                               "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)")
+            connection.commit()
+            self._local.connection = connection
+        return connection
+
+    # (bytes, seconds left) or None when missing or expired
+    def get(self, key):
+        row = self._connection().execute("SELECT value, expires_at FROM cache WHERE key = ? AND expires_at > ?",
+                                         (key, time.time())).fetchone()
+        return (bytes(row[0]), row[1] - time.time()) if row else None
+
+    def set(self, key, data, ttl):
+        connection = self._connection()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (key, data, time.time() + ttl))
+
+    # Drop expired rows; returns how many went
+    def purge(self):
+        connection = self._connection()
+        with connection:
+            return connection.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def clear(self):
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM cache")
+
+
+def _resp_command(*args):
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        arg = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def _resp_read(stream):
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise CacheBackendError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        size = int(rest)
+        if size < 0:
+            return None
+        data = stream.read(size + 2)
+        if len(data) != size + 2:
+            raise ConnectionError("connection closed")
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        return None if count < 0 else [_resp_read(stream) for _ in range(count)]
+    raise CacheBackendError(f"bad RESP reply {line!r}")
+
+
+# Minimal Redis client: one connection per process, shared under a lock and
+# reopened after a network error
+class RedisBackend:
+    def __init__(self, host="127.0.0.1", port=6379, db=0, timeout=REDIS_TIMEOUT):
+        self.address = (host, port)
+        self.db = db
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._socket = None
+        self._stream = None
+
+    def _connect(self):
+        self._socket = socket.create_connection(self.address, timeout=self.timeout)
+        # Small pipelined requests must not sit in Nagle's buffer waiting for an ACK
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._stream = self._socket.makefile("rb")
+        if self.db:
+            self._socket.sendall(_resp_command("SELECT", self.db))
+            _resp_read(self._stream)
+
+    def _close(self):
+        if self._socket is not None:
+            self._stream.close()
+            self._socket.close()
+        self._socket = self._stream = None
+
+    # Send several commands in one write and read their replies in order
+    def pipeline(self, *commands):
+        with self._lock:
+            try:
+                if self._socket is None:
+                    self._connect()
+                self._socket.sendall(b"".join(_resp_command(*args) for args in commands))
+                return [_resp_read(self._stream) for _ in commands]
+            except Exception:
+                # Unread replies would answer the next request; start over on a fresh connection
+                self._close()
+                raise
+
+    def execute(self, *args):
+        return self.pipeline(args)[0]
+
+    # GET and PTTL are pipelined, so the value and the time it has left cost one round trip
+    def get(self, key):
+        data, pttl = self.pipeline(("GET", key), ("PTTL", key))
+        if data is None or pttl <= 0:
+            return None
+        return data, pttl / 1000.0
+
+    def set(self, key, data, ttl):
+        self.execute("SET", key, data, "PX", max(int(ttl * 1000), 1))
+
+    def clear(self):
+        self.execute("FLUSHDB")
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+# Backend named by a URL (see the top of this file); None for an empty string
+def from_url(url):
+    if not url:
+        return None
+    parts = urlsplit(url)
+    if parts.scheme == "sqlite":
+        return SQLiteBackend(parts.netloc + parts.path[1:])
+    if parts.scheme == "redis":
+        db = int(parts.path.strip("/") or 0)
+        return RedisBackend(parts.hostname or "127.0.0.1", parts.port or 6379, db)
+    raise ValueError(f"Unknown OPTIONS_APP_CACHE_BACKEND {url!r}")
+
+
+_default_backend = None
+_default_lock = threading.Lock()
+
+
+def default_backend():
+    global _default_backend
+    with _default_lock:
+        if _default_backend is None and CACHE_BACKEND:
+            _default_backend = from_url(CACHE_BACKEND)
+        return _default_backend
+
+
+# Errors a backend may raise that must only ever cost a cache miss
+BACKEND_ERRORS = (OSError, sqlite3.Error, CacheBackendError, ValueError)
+
+
+# In-memory server for the handful of commands RedisBackend uses (PING, GET, SET
+# with EX/PX, DEL, PTTL, FLUSHDB, DBSIZE and SELECT)
+class RespStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _RespHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.server_address
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+    def _pttl(self, key):
+        entry = self._live(key)
+        if entry is None:
+            return -2
+        return -1 if entry[1] is None else int((entry[1] - time.monotonic()) * 1000)
+
+    def command(self, args):
+        name = args[0].upper()
+        with self.lock:
+            if name == b"PING":
+                return "PONG"
+            if name == b"SELECT" or name == b"FLUSHDB":
+                if name == b"FLUSHDB":
+                    self.data.clear()
+                return "OK"
+            if name == b"DBSIZE":
+                return sum(1 for key in list(self.data) if self._live(key))
+            if name == b"GET":
+                entry = self._live(args[1])
+                return entry[0] if entry else None
+            if name == b"PTTL":
+                return self._pttl(args[1])
+            if name == b"DEL":
+                return sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+            if name == b"SET":
+                expires_at = None
+                if len(args) >= 5 and args[3].upper() in (b"PX", b"EX"):
+                    seconds = int(args[4]) / (1000.0 if args[3].upper() == b"PX" else 1.0)
+                    expires_at = time.monotonic() + seconds
+                self.data[args[1]] = (args[2], expires_at)
+                return "OK"
+        raise CacheBackendError(f"ERR unsupported command {name.decode(errors='replace')}")
+
+
+def _resp_reply(value):
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_resp_reply(item) for item in value)
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        while True:
+            try:
+                args = _resp_read(self.rfile)
+            except (ConnectionError, CacheBackendError, ValueError):
+                return
+            try:
+                reply = _resp_reply(self.server.command(args))
+            except CacheBackendError as e:
+                reply = b"-%s\r\n" % str(e).encode()
+            self.wfile.write(reply)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared cache backend tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the in-memory Redis-protocol stand-in")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=6380)
+    purge = commands.add_parser("purge", help="drop expired entries from a SQLite backend")
+    purge.add_argument("url", nargs="?", default=CACHE_BACKEND)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        with RespStandIn(args.host, args.port) as server:
+            print(f"Serving on {server.server_address[0]}:{server.server_address[1]}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    else:
+        backend = from_url(args.url)
+        if not isinstance(backend, SQLiteBackend):
+            parser.error("purge needs a sqlite:// backend")
+        print(f"Removed {backend.purge()} expired entries")
+
+
+if __name__ == "__main__":
+    main()
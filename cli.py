@@ -0,0 +1,108 @@
+# Headless batch mode: runs the options-page analytics for a list of tickers
+# without Streamlit and writes one file per ticker and table, plus a summary.
+#
+# Tickers are processed in parallel on a process pool. Worker processes share
+# fetched option chains with each other and with the Streamlit app through the
+# snapshot store (OPTIONS_APP_SNAPSHOT_DIR), and computed put/call ratios go into
+# the same history the app charts. Provider settings (OPTIONS_APP_PROVIDER etc.)
+# are read from the environment as in the app. The upstream request rate
+# (OPTIONS_APP_FETCH_RATE, OPTIONS_APP_FETCH_BURST) is split across the workers, so the whole batch
+# stays within one process's limit.
+#
+# Usage:
+#   python cli.py AAPL MSFT SPY --output reports
+#   python cli.py --tickers-file watchlist.txt --expiries 4 --format parquet --workers 8
+#
+# Writes <output>/<TICKER>/{contracts,put_call,max_pain,oi_profile,gex}.<format>
+# and <output>/summary.<format>. Exits with status 1 when any ticker failed.
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import analytics
+import put_call
+import put_call_history
+import scheduler
+import watchlist
+
+FORMATS = ["csv", "parquet"]
+
+
+def write_table(frame, path, output_format):
+    if output_format == "parquet":
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+
+
+# Pool initializer: each worker gets an equal share of the process-wide fetch rate
+def init_worker(rate_per_second, burst):
+    scheduler.RATE_PER_SECOND = rate_per_second
+    scheduler.BURST = burst
+
+
+# Runs in a worker process: report one ticker and write its tables. Returns
+# (ticker, summary, error message) so one bad ticker never stops the batch.
+def run_ticker(ticker, output, output_format, rate, max_expiries):
+    try:
+        with scheduler.background():
+            report = analytics.ticker_report(ticker, rate, max_expiries=max_expiries)
+        summary = report.pop("summary")
+        directory = os.path.join(output, summary["ticker"])
+        os.makedirs(directory, exist_ok=True)
+        for name, frame in report.items():
+            write_table(frame, os.path.join(directory, f"{name}.{output_format}"), output_format)
+        ratios = {kind: summary[f"{kind}_ratio"] for kind in put_call.RATIO_KINDS}
+        put_call_history.record_ratios(summary["ticker"], ratios, summary["expirations"])
+        return ticker, summary, None
+    except Exception as e:
+        return ticker, None, str(e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch options analytics without the Streamlit UI")
+    parser.add_argument("tickers", nargs="*", help="ticker symbols")
+    parser.add_argument("--tickers-file", help="file of tickers (comma, space or newline separated)")
+    parser.add_argument("--output", default="reports", help="output directory")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--expiries", type=int, default=None, help="nearest N expirations per ticker (default all)")
+    parser.add_argument("--rate", type=float, default=4.5, help="risk-free rate in percent")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    text = " ".join(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            text += " " + f.read()
+    tickers = watchlist.parse_tickers(text)
+    if not tickers:
+        parser.error("no tickers given")
+
+    os.makedirs(args.output, exist_ok=True)
+    summaries, failed = [], []
+    workers = min(args.workers, len(tickers))
+    share = (scheduler.RATE_PER_SECOND / workers, max(1, scheduler.BURST // workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=share) as pool:
+        futures = [pool.submit(run_ticker, ticker, args.output, args.format, args.rate / 100, args.expiries)
+                   for ticker in tickers]
+        for future in as_completed(futures):
+            ticker, summary, error = future.result()
+            if error is None:
+                summaries.append(summary)
+                print(f"{ticker}: {summary['expirations']} expirations, {summary['contracts']} contracts")
+                if summary["failed_expirations"]:
+                    print(f"{ticker}: missing expirations: {summary['failed_expirations']}", file=sys.stderr)
+            else:
+                failed.append(ticker)
+                print(f"{ticker}: failed: {error}", file=sys.stderr)
+
+    summary = analytics.summary_frame(summaries).sort_values("ticker", ignore_index=True)
+    summary_path = os.path.join(args.output, f"summary.{args.format}")
+    write_table(summary, summary_path, args.format)
+    print(f"Wrote {len(summaries)} of {len(tickers)} tickers to {args.output} (summary: {summary_path})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
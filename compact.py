@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# Object columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+_INT32 = np.iinfo(np.int32)
+
+
+def _compact_float(values):
+    finite = values[~np.isnan(values)]
+    if finite.size == values.size and finite.size and np.array_equal(finite, np.round(finite)) \
+            and _INT32.min <= finite.min() and finite.max() <= _INT32.max:
+        return values.astype(np.int32)
+    # Only when every value survives the float32 round trip bit for bit, so strikes
+    # and quotes such as 269.3 never come back to float64 code as 269.29998779...
+    narrowed = values.astype(np.float32)
+    if np.array_equal(narrowed, values, equal_nan=True):
+        return narrowed
+    return values
+
+
+# Smallest lossless dtypes for an option chain frame: whole-number float columns
+# without gaps (openInterest) become int32, other floats become float32 when that
+# is exact (volume with missing values, half-dollar strikes), and repeated strings
+# (currency, contractSize) become categoricals. Unique identifiers and timestamps
+# are left alone. Returns the new frame and its (bytes before, bytes after),
+# counted per column from nbytes; strings are only measured deeply where they
+# were converted, so untouched object columns count at their pointer size.
+def _compact(frame):
+    columns = {}
+    before = after = 0
+    for name in frame.columns:
+        series = frame[name]
+        dtype = series.dtype
+        new = None
+        if dtype == np.float64:
+            values = series.to_numpy()
+            new = _compact_float(values)
+            if new is values:
+                new = None
+        elif dtype == np.int64 and len(series) and _INT32.min <= series.min() and series.max() <= _INT32.max:
+            new = series.to_numpy().astype(np.int32)
+        elif dtype == object and len(series) and series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+            new = pd.Categorical(series)
+            before += series.memory_usage(deep=True, index=False)
+            after += new.memory_usage(deep=True)
+        if new is None:
+            size = series.array.nbytes
+            before += size
+            after += size
+            columns[name] = series
+        else:
+            if dtype != object:
+                before += series.array.nbytes
+                after += new.nbytes
+            columns[name] = new
+    index = frame.index.nbytes
+    return pd.DataFrame(columns, index=frame.index, copy=False), (int(before + index), int(after + index))
+
+
+def compact_frame(frame):
+    return _compact(frame)[0]
+
+
+# Compact both sides of a chain; returns the new chain and (bytes before, bytes after)
+def compact_chain(chain):
+    calls, (calls_before, calls_after) = _compact(chain.calls)
+    puts, (puts_before, puts_after) = _compact(chain.puts)
+    return chain._replace(calls=calls, puts=puts), (calls_before + puts_before, calls_after + puts_after)
@@ -0,0 +1,73 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import greeks
+import market_data
+import put_call
+
+# Spot levels (as a fraction of spot) scanned for the zero-gamma flip
+FLIP_RANGE = 0.2
+FLIP_POINTS = 81
+
+# Gamma exposure in dollars per 1% move of the underlying, under the usual
+# convention that dealers are long the calls and short the puts customers trade.
+# by_strike: call_gex, put_gex and net_gex per strike. profile: total exposure at
+# each spot level of the flip scan. flip: spot level nearest the current spot where
+# the total changes sign, or None if it never does within the scan.
+GammaExposure = namedtuple("GammaExposure", ["ticker", "spot", "by_strike", "total", "profile", "flip"])
+
+
+def _dollar_gamma(gamma, spot):
+    return gamma * put_call.CONTRACT_MULTIPLIER * spot * spot * 0.01
+
+
+# Contracts that carry exposure: open interest and a usable quoted volatility
+def _contracts(chains, now):
+    frame = market_data.chain_frame(chains)
+    strikes = frame["strike"].to_numpy(dtype=np.float64)
+    open_interest = np.nan_to_num(frame["openInterest"].to_numpy(dtype=np.float64))
+    vol = frame["impliedVolatility"].to_numpy(dtype=np.float64)
+    keep = (open_interest > 0) & (vol > 0)
+    expiries = frame["expiration"].to_numpy()[keep]
+    unique_expiries, inverse = np.unique(expiries, return_inverse=True)
+    t = np.zeros(0)
+    if len(unique_expiries):
+        t = np.atleast_1d(greeks.time_to_expiry(list(unique_expiries), now=now))[inverse]
+    sign = np.where(frame["is_call"].to_numpy(dtype=bool)[keep], 1.0, -1.0)
+    return strikes[keep], t, vol[keep], open_interest[keep] * sign, sign
+
+
+# Linear interpolation of the sign change in profile closest to spot
+def _zero_crossing(levels, totals, spot):
+    crossings = np.flatnonzero(np.sign(totals[:-1]) * np.sign(totals[1:]) < 0)
+    if not len(crossings):
+        return None
+    lo = crossings[np.argmin(np.abs(levels[crossings] - spot))]
+    x0, x1, y0, y1 = levels[lo], levels[lo + 1], totals[lo], totals[lo + 1]
+    return float(x0 - y0 * (x1 - x0) / (y1 - y0))
+
+
+# Net dealer gamma exposure for every contract across all expiries ({expiry: chain}).
+# Gamma is evaluated once per contract at spot for the by-strike view, and once over
+# a (spot levels x contracts) grid for the flip scan.
+def gamma_exposure(ticker, chains, spot, rate, dividend_yield=0.0, now=None):
+    strikes, t, vol, signed_oi, sign = _contracts(chains, now)
+    contract_gex = _dollar_gamma(greeks.gamma(spot, strikes, t, rate, vol, dividend_yield), spot) * signed_oi
+    contract_gex = np.nan_to_num(contract_gex)
+
+    by_strike = pd.DataFrame({
+        "strike": strikes,
+        "call_gex": np.where(sign > 0, contract_gex, 0.0),
+        "put_gex": np.where(sign < 0, contract_gex, 0.0),
+    }).groupby("strike").sum()
+    by_strike["net_gex"] = by_strike["call_gex"] + by_strike["put_gex"]
+
+    levels = spot * np.linspace(1 - FLIP_RANGE, 1 + FLIP_RANGE, FLIP_POINTS)
+    grid_gamma = greeks.gamma(levels[:, None], strikes[None, :], t[None, :], rate, vol[None, :], dividend_yield)
+    totals = _dollar_gamma(np.nan_to_num(grid_gamma) @ signed_oi, levels)
+    profile = pd.Series(totals, index=pd.Index(levels, name="spot"), name="total_gex")
+
+    return GammaExposure(ticker, spot, by_strike, float(contract_gex.sum()), profile,
+                         _zero_crossing(levels, totals, spot))
@@ -0,0 +1,122 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_YEAR = 365.0
+GREEK_COLUMNS = ["delta", "gamma", "theta", "vega", "rho"]
+
+# Listed US equity options stop trading at 16:00 New York time on expiry day
+EXPIRY_CLOSE = pd.Timedelta(hours=16)
+EXPIRY_TZ = "America/New_York"
+
+# Floor for time to expiry so same-day contracts don't divide by zero
+MIN_TIME = 1.0 / (DAYS_PER_YEAR * 24 * 60)
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+# Years from now until the close on expiration_date ("YYYY-MM-DD", or an array of them)
+def time_to_expiry(expiration_date, now=None):
+    now = pd.Timestamp.now(tz=EXPIRY_TZ) if now is None else pd.Timestamp(now).tz_convert(EXPIRY_TZ)
+    expiry = pd.to_datetime(expiration_date)
+    if isinstance(expiry, pd.Timestamp):
+        expiry = expiry.tz_localize(EXPIRY_TZ) + EXPIRY_CLOSE
+        return max((expiry - now).total_seconds() / (DAYS_PER_YEAR * 86400), MIN_TIME)
+    expiry = pd.DatetimeIndex(expiry).tz_localize(EXPIRY_TZ) + EXPIRY_CLOSE
+    years = np.asarray((expiry - now).total_seconds(), dtype=float) / (DAYS_PER_YEAR * 86400)
+    return np.maximum(years, MIN_TIME)
+
+
+def _d1_d2(spot, strike, t, rate, vol, dividend_yield):
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * vol * vol) * t) / (vol * sqrt_t)
+    return d1, d1 - vol * sqrt_t, sqrt_t
+
+
+# Black-Scholes-Merton price; every argument may be a scalar or a NumPy array
+def black_scholes_price(spot, strike, t, rate, vol, is_call, dividend_yield=0.0):
+    from scipy.special import ndtr
+
+    spot, strike, t, vol = (np.asarray(x, dtype=float) for x in (spot, strike, t, vol))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2, _ = _d1_d2(spot, strike, t, rate, vol, dividend_yield)
+        disc_q = np.exp(-dividend_yield * t)
+        disc_r = np.exp(-rate * t)
+        call = spot * disc_q * ndtr(d1) - strike * disc_r * ndtr(d2)
+        put = strike * disc_r * ndtr(-d2) - spot * disc_q * ndtr(-d1)
+    return np.where(is_call, call, put)
+
+
+# All Greeks for whole arrays of contracts in one pass. Theta is per calendar day,
+# vega per 1 vol point and rho per 1% change in rates. Contracts with a missing or
+# non-positive volatility get NaN.
+def compute_greeks(spot, strike, t, rate, vol, is_call, dividend_yield=0.0):
+    # scipy is only loaded once Greeks are actually requested, keeping it off the cold-start path
+    from scipy.special import ndtr
+
+    spot, strike, t, vol = (np.asarray(x, dtype=float) for x in (spot, strike, t, vol))
+    is_call = np.asarray(is_call, dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol = np.where(vol > 0, vol, np.nan)
+        d1, d2, sqrt_t = _d1_d2(spot, strike, t, rate, vol, dividend_yield)
+        disc_q = np.exp(-dividend_yield * t)
+        disc_r = np.exp(-rate * t)
+        pdf_d1 = _norm_pdf(d1)
+        sign = np.where(is_call, 1.0, -1.0)
+        cdf_d1 = ndtr(sign * d1)
+        cdf_d2 = ndtr(sign * d2)
+
+        delta = sign * disc_q * cdf_d1
+        gamma = disc_q * pdf_d1 / (spot * vol * sqrt_t)
+        theta = (-spot * disc_q * pdf_d1 * vol / (2.0 * sqrt_t)
+                 - sign * rate * strike * disc_r * cdf_d2
+                 + sign * dividend_yield * spot * disc_q * cdf_d1) / DAYS_PER_YEAR
+        vega = spot * disc_q * pdf_d1 * sqrt_t / 100.0
+        rho = sign * strike * t * disc_r * cdf_d2 / 100.0
+    return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega, "rho": rho}
+
+
+# Gamma alone, for callers that evaluate it over large spot x contract grids and
+# don't need the other Greeks (gamma is the same for calls and puts)
+def gamma(spot, strike, t, rate, vol, dividend_yield=0.0):
+    spot, strike, t, vol = (np.asarray(x, dtype=float) for x in (spot, strike, t, vol))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol = np.where(vol > 0, vol, np.nan)
+        d1, _, sqrt_t = _d1_d2(spot, strike, t, rate, vol, dividend_yield)
+        return np.exp(-dividend_yield * t) * _norm_pdf(d1) / (spot * vol * sqrt_t)
+
+
+# Return a copy of an option chain DataFrame with Greek columns added, using the
+# chain's impliedVolatility. t and is_call may be scalars or per-row arrays, so a
+# frame mixing several expiries or both sides is still a single call.
+def add_greeks(chain, spot, t, is_call, rate, dividend_yield=0.0, vol_column="impliedVolatility"):
+    values = compute_greeks(spot, chain["strike"].to_numpy(), t, rate,
+                            chain[vol_column].to_numpy(), is_call, dividend_yield)
+    return chain.assign(**values)
+
+
+# Reference per-contract implementation with plain Python math, kept for
+# benchmarking and cross-checking the vectorized engine
+def naive_greeks(spot, strike, t, rate, vol, is_call, dividend_yield=0.0):
+    if not vol or vol <= 0 or vol != vol:
+        return {name: float("nan") for name in GREEK_COLUMNS}
+    cdf = lambda x: 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+    sqrt_t = math.sqrt(t)
+    d1 = (math.log(spot / strike) + (rate - dividend_yield + 0.5 * vol * vol) * t) / (vol * sqrt_t)
+    d2 = d1 - vol * sqrt_t
+    disc_q = math.exp(-dividend_yield * t)
+    disc_r = math.exp(-rate * t)
+    pdf_d1 = math.exp(-0.5 * d1 * d1) / math.sqrt(2.0 * math.pi)
+    sign = 1.0 if is_call else -1.0
+    return {
+        "delta": sign * disc_q * cdf(sign * d1),
+        "gamma": disc_q * pdf_d1 / (spot * vol * sqrt_t),
+        "theta": (-spot * disc_q * pdf_d1 * vol / (2.0 * sqrt_t)
+                  - sign * rate * strike * disc_r * cdf(sign * d2)
+                  + sign * dividend_yield * spot * disc_q * cdf(sign * d1)) / DAYS_PER_YEAR,
+        "vega": spot * disc_q * pdf_d1 * sqrt_t / 100.0,
+        "rho": sign * strike * t * disc_r * cdf(sign * d2) / 100.0,
+    }
@@ -0,0 +1,144 @@
+import math
+
+import numpy as np
+
+# Volatility search interval and stopping rules for the solver
+VOL_LOWER = 1e-4
+VOL_UPPER = 5.0
+PRICE_TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+
+IV_COLUMNS = ["iv_calc", "iv_iterations", "iv_converged", "iv_error"]
+
+
+def _price_and_vega(spot, strike, t, rate, vol, sign, dividend_yield):
+    from scipy.special import ndtr
+
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * vol * vol) * t) / (vol * sqrt_t)
+    d2 = d1 - vol * sqrt_t
+    disc_q = spot * np.exp(-dividend_yield * t)
+    disc_r = strike * np.exp(-rate * t)
+    price = sign * (disc_q * ndtr(sign * d1) - disc_r * ndtr(sign * d2))
+    vega = disc_q * np.exp(-0.5 * d1 * d1) / math.sqrt(2.0 * math.pi) * sqrt_t
+    return price, vega
+
+
+# Solve Black-Scholes implied volatility for whole arrays of contracts at once.
+#
+# Every contract runs safeguarded Newton steps inside a [low, high] bracket that
+# tightens after each evaluation; whenever a Newton step would leave the bracket
+# (tiny vega, deep wings) that contract takes a bisection step instead. Only the
+# still-unconverged contracts are re-evaluated on each iteration.
+#
+# Returns a dict of arrays: iv (NaN when unsolvable), iterations, converged,
+# bisection_steps and error (model price minus market price). Prices outside the
+# no-arbitrage bounds are reported as not converged with zero iterations.
+def solve_implied_vol(price, spot, strike, t, rate, is_call, dividend_yield=0.0,
+                      tol=PRICE_TOLERANCE, max_iter=MAX_ITERATIONS):
+    price, spot, strike, t = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, spot, strike, t)))
+    sign = np.broadcast_to(np.where(np.asarray(is_call, dtype=bool), 1.0, -1.0), price.shape)
+    shape, n = price.shape, price.size
+    price, spot, strike, t, sign = (x.ravel() for x in (price, spot, strike, t, sign))
+
+    iv = np.full(n, np.nan)
+    iterations = np.zeros(n, dtype=np.int32)
+    bisections = np.zeros(n, dtype=np.int32)
+    converged = np.zeros(n, dtype=bool)
+    error = np.full(n, np.nan)
+
+    # Discard contracts whose price no volatility can reproduce
+    with np.errstate(invalid="ignore"):
+        forward_s = spot * np.exp(-dividend_yield * t)
+        forward_k = strike * np.exp(-rate * t)
+        intrinsic = np.maximum(sign * (forward_s - forward_k), 0.0)
+        upper = np.where(sign > 0, forward_s, forward_k)
+        valid = np.isfinite(price) & (t > 0) & (strike > 0) & (spot > 0) & (price > intrinsic) & (price < upper)
+
+    idx = np.flatnonzero(valid)
+    low = np.full(idx.size, VOL_LOWER)
+    high = np.full(idx.size, VOL_UPPER)
+    # Brenner-Subrahmanyam starting point, clipped into the bracket
+    vol = np.clip(math.sqrt(2.0 * math.pi) * price[idx] / (spot[idx] * np.sqrt(t[idx])), 0.05, 2.0)
+
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+        p, s, k, tt, sg = price[idx], spot[idx], strike[idx], t[idx], sign[idx]
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            model, vega = _price_and_vega(s, k, tt, rate, vol, sg, dividend_yield)
+        diff = model - p
+        iterations[idx] += 1
+
+        done = np.abs(diff) < tol
+        iv[idx[done]] = vol[done]
+        error[idx[done]] = diff[done]
+        converged[idx[done]] = True
+
+        # Price is increasing in volatility, so the sign of diff tightens the bracket
+        high = np.where(diff > 0, vol, high)
+        low = np.where(diff < 0, vol, low)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = vol - diff / vega
+        use_bisection = ~np.isfinite(newton) | (newton <= low) | (newton >= high)
+        bisections[idx[use_bisection & ~done]] += 1
+        vol = np.where(use_bisection, 0.5 * (low + high), newton)
+
+        # Bracket collapsed without hitting the price tolerance: keep the midpoint,
+        # which only counts as a solution if it is not pinned to the search limits
+        collapsed = ~done & (high - low < 1e-12)
+        iv[idx[collapsed]] = vol[collapsed]
+        error[idx[collapsed]] = diff[collapsed]
+        converged[idx[collapsed]] = (vol[collapsed] > 2 * VOL_LOWER) & (vol[collapsed] < VOL_UPPER - 1e-6)
+
+        keep = ~(done | collapsed)
+        idx, vol, low, high = idx[keep], vol[keep], low[keep], high[keep]
+
+    # Whatever is left hit max_iter; report its last iterate and residual
+    if idx.size:
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            model, _ = _price_and_vega(spot[idx], strike[idx], t[idx], rate, vol, sign[idx], dividend_yield)
+        iv[idx] = vol
+        error[idx] = model - price[idx]
+
+    return {
+        "iv": iv.reshape(shape),
+        "iterations": iterations.reshape(shape),
+        "converged": converged.reshape(shape),
+        "bisection_steps": bisections.reshape(shape),
+        "error": error.reshape(shape),
+    }
+
+
+# Price to invert: bid/ask midpoint when the quote is usable, otherwise lastPrice
+def market_price(chain):
+    bid = chain["bid"].to_numpy(dtype=float) if "bid" in chain else np.full(len(chain), np.nan)
+    ask = chain["ask"].to_numpy(dtype=float) if "ask" in chain else np.full(len(chain), np.nan)
+    last = chain["lastPrice"].to_numpy(dtype=float)
+    quoted = (bid > 0) & (ask >= bid)
+    return np.where(quoted, 0.5 * (bid + ask), last)
+
+
+# Return a copy of an option chain with recomputed IV and per-contract convergence
+# diagnostics. t and is_call may be scalars or per-row arrays.
+def add_implied_vol(chain, spot, t, is_call, rate, dividend_yield=0.0):
+    result = solve_implied_vol(market_price(chain), spot, chain["strike"].to_numpy(dtype=float),
+                               t, rate, is_call, dividend_yield)
+    return chain.assign(
+        iv_calc=result["iv"],
+        iv_iterations=result["iterations"],
+        iv_converged=result["converged"],
+        iv_error=result["error"],
+    )
+
+
+# Summary of solver behaviour over a chain that went through add_implied_vol
+def convergence_summary(chain):
+    solved = chain["iv_converged"]
+    return {
+        "contracts": len(chain),
+        "converged": int(solved.sum()),
+        "unsolved": int((~solved).sum()),
+        "mean_iterations": float(chain.loc[solved, "iv_iterations"].mean()) if solved.any() else float("nan"),
+        "max_abs_error": float(chain.loc[solved, "iv_error"].abs().max()) if solved.any() else float("nan"),
+    }
@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# When set, the metrics snapshot is written to this file after every page run
+METRICS_FILE = os.environ.get("OPTIONS_APP_METRICS_FILE", "")
+
+
+# Process-wide stage timers and counters, safe to update from fetch worker threads.
+# Stages timed on the page's own thread are also kept per run, so the debug panel
+# can show where the last rerun of this session spent its time.
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+        self._local = threading.local()
+
+    def start_run(self):
+        self._local.run = []
+
+    def last_run(self):
+        return list(getattr(self._local, "run", []))
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timer = self._timers.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+            timer["count"] += 1
+            timer["total"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+            timer["last"] = seconds
+        run = getattr(self._local, "run", None)
+        if run is not None:
+            run.append((name, seconds))
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            timers = {
+                name: dict(timer, mean=timer["total"] / timer["count"])
+                for name, timer in self._timers.items()
+            }
+            return {"timers": timers, "counters": dict(self._counters)}
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+metrics = Metrics()
+stage = metrics.stage
+count = metrics.count
+
+
+# Rough in-memory size of a fetched payload, used as the "bytes downloaded" figure
+# since the providers don't expose wire sizes
+def payload_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, "calls") and hasattr(value, "puts"):
+        return payload_size(value.calls) + payload_size(value.puts)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+# Everything the debug panel and metrics dump show, as plain JSON-ready data
+def collect(extra=None):
+    data = metrics.snapshot()
+    data["last_run"] = [{"stage": name, "ms": seconds * 1e3} for name, seconds in metrics.last_run()]
+    data.update(extra or {})
+    return data
+
+
+# Stage timers as a table in milliseconds, slowest mean first
+def timer_table(data):
+    rows = [
+        {"stage": name, "count": timer["count"], "mean_ms": timer["mean"] * 1e3,
+         "max_ms": timer["max"] * 1e3, "last_ms": timer["last"] * 1e3}
+        for name, timer in data["timers"].items()
+    ]
+    frame = pd.DataFrame(rows, columns=["stage", "count", "mean_ms", "max_ms", "last_ms"])
+    return frame.sort_values("mean_ms", ascending=False, ignore_index=True)
+
+
+def to_json(data):
+    return json.dumps(data, indent=2, default=str)
+
+
+# Write the metrics dump atomically so external scrapers never read half a file
+def dump(data, path=METRICS_FILE):
+    if path:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(to_json(data))
+        os.replace(tmp_path, path)
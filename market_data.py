@@ -0,0 +1,324 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+import cache_backend
+import providers
+import scheduler
+from cache import TTLCache
+from compact import compact_chain
+from instrumentation import metrics, payload_size
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Seconds each kind of response stays fresh. Intraday history doubles as the
+# "quote" and goes stale quickly; company info barely changes during a day.
+TTLS = {
+    "quote": 15,
+    "history": 5 * 60,
+    "info": 6 * 3600,
+    "options": 10 * 60,
+    "option_chain": 2 * 60,
+}
+
+# Concurrency limit and per-request timeout (seconds) for multi-expiry fetches
+MAX_FETCH_WORKERS = 8
+FETCH_TIMEOUT = 15.0
+
+# History periods short enough to be treated as live quotes
+QUOTE_PERIODS = {"1d", "5d"}
+
+_cache = TTLCache(maxsize=512)
+# Sessions that miss the cache for the same key at the same time share one fetch
+_flight = SingleFlight()
+_MISSING = object()
+_endpoint_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(endpoint, hit):
+    with _stats_lock:
+        stats = _endpoint_stats.setdefault(endpoint, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+
+# After a shared cache error the backend is left alone for this many seconds, so
+# an unreachable server doesn't add a connect timeout to every fetch
+SHARED_CACHE_RETRY_AFTER = 30.0
+_shared_down_until = 0.0
+
+
+def _shared_backend():
+    if time.monotonic() < _shared_down_until:
+        return None
+    return cache_backend.default_backend()
+
+
+def _shared_failed(action, key, error):
+    global _shared_down_until
+    _shared_down_until = time.monotonic() + SHARED_CACHE_RETRY_AFTER
+    metrics.count("shared_cache.errors")
+    logger.warning("Shared cache %s failed for %s: %s", action, key, error)
+
+
+def _shared_key(key):
+    return cache_backend.encode_key(providers.get_provider().name, key)
+
+
+# Value and seconds of freshness left from the shared cross-process cache, or
+# (_MISSING, 0) when there is none; a broken backend only ever costs a miss
+def _shared_get(key):
+    backend = _shared_backend()
+    if backend is None:
+        return _MISSING, 0
+    try:
+        with metrics.stage("cache.shared_get"):
+            entry = backend.get(_shared_key(key))
+            if entry is None:
+                return _MISSING, 0
+            data, ttl_left = entry
+            return cache_backend.deserialize(data), ttl_left
+    except cache_backend.BACKEND_ERRORS as e:
+        _shared_failed("read", key, e)
+        return _MISSING, 0
+
+
+def _shared_set(key, value, ttl):
+    backend = _shared_backend()
+    if backend is None:
+        return
+    try:
+        data = cache_backend.serialize(value)
+    except TypeError as e:
+        # A value this process can't encode is no reason to back off from the backend
+        metrics.count("shared_cache.unserializable")
+        logger.warning("Not sharing %s: %s", key, e)
+        return
+    try:
+        with metrics.stage("cache.shared_set"):
+            backend.set(_shared_key(key), data, ttl)
+        metrics.count("bytes.shared_cache", len(data))
+    except cache_backend.BACKEND_ERRORS as e:
+        _shared_failed("write", key, e)
+
+
+# Return the cached value for key, calling fetch() only when it is missing or stale.
+# Concurrent misses for the same key wait on a single in-flight fetch, and a miss
+# in this process is looked up in the shared cache (if configured) before fetching.
+def _cached(endpoint, key, fetch, ttl=None):
+    value = _cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _record(endpoint, True)
+        return value
+    _record(endpoint, False)
+    ttl = TTLS[endpoint] if ttl is None else ttl
+    # The upstream request queues at the highest priority of anyone waiting on it,
+    # so a page view joining a background scan's fetch isn't stuck behind the scan
+    level = scheduler.Priority(scheduler.current_priority())
+
+    def fetch_and_store():
+        # A flight for this key may have finished between the miss above and now;
+        # one peek, so an entry expiring in between can't turn into a None result, and
+        # the miss above isn't counted a second time
+        value = _cache.peek(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value, ttl_left = _shared_get(key)
+        if value is not _MISSING:
+            metrics.count(f"shared_cache.{endpoint}")
+            _cache.set(key, value, min(ttl, ttl_left))
+            return value
+        with metrics.stage(f"fetch.{endpoint}"), scheduler.priority(level):
+            value = fetch()
+        metrics.count(f"bytes.{endpoint}", payload_size(value))
+        _cache.set(key, value, ttl)
+        _shared_set(key, value, ttl)
+        return value
+
+    value, shared = _flight.do(key, fetch_and_store, level=level.level, on_join=level.raise_to)
+    if shared:
+        metrics.count(f"singleflight.{endpoint}")
+    return value
+
+
+# Every provider request goes through the fetch scheduler: rate-limited backends
+# wait for a token (page views ahead of background scans) and transient failures
+# are retried with backoff
+def _upstream(key, method, *args):
+    provider = providers.get_provider()
+    return scheduler.default_scheduler().call(key, lambda: getattr(provider, method)(*args),
+                                              rate_limited=provider.rate_limited)
+
+
+# "aapl " and "AAPL" share cache entries, so every view of a ticker reuses the same chains
+def normalize_ticker(ticker):
+    return ticker.strip().upper()
+
+
+def get_info(ticker):
+    ticker = normalize_ticker(ticker)
+    return _cached("info", ("info", ticker), lambda: _upstream(("info", ticker), "info", ticker))
+
+
+def get_history(ticker, period):
+    ticker = normalize_ticker(ticker)
+    endpoint = "quote" if period.lower() in QUOTE_PERIODS else "history"
+    key = ("history", ticker, period)
+    return _cached(endpoint, key, lambda: _upstream(key, "history", ticker, period))
+
+
+def get_options(ticker):
+    ticker = normalize_ticker(ticker)
+    # tuple() again because the shared cache hands JSON lists back
+    return tuple(_cached("options", ("options", ticker), lambda: _upstream(("options", ticker), "options", ticker)))
+
+
+# Warm restarts: a snapshot on disk that is still within the chain TTL is served
+# instead of going to the network; every network fetch is appended to the store
+def _fetch_option_chain(ticker, expiration_date):
+    # Imported here so pyarrow loads with the first chain rather than at startup
+    import snapshot_store
+
+    store = snapshot_store.default_store()
+    if store is not None:
+        chain = store.latest(ticker, expiration_date, max_age=TTLS["option_chain"])
+        if chain is not None:
+            return chain
+    chain = _upstream(("option_chain", ticker, expiration_date), "option_chain", ticker, expiration_date)
+    snapshot_store.record_chain(ticker, expiration_date, chain)
+    return chain
+
+
+# Cached chains are stored with compact dtypes so dozens of them fit in memory
+def _compact_option_chain(chain):
+    chain, (before, after) = compact_chain(chain)
+    metrics.count("bytes.chain_raw", before)
+    metrics.count("bytes.chain_compact", after)
+    return chain
+
+
+def get_option_chain(ticker, expiration_date):
+    ticker = normalize_ticker(ticker)
+    return _cached("option_chain", ("option_chain", ticker, expiration_date),
+                   lambda: _compact_option_chain(_fetch_option_chain(ticker, expiration_date)))
+
+
+# Latest price for the ticker, taken from the short-lived intraday quote
+def get_spot(ticker):
+    history = get_history(ticker, "1d")
+    return float(history["Close"].iloc[-1])
+
+
+# True when the response is already in the cache and still fresh
+def has_option_chain(ticker, expiration_date):
+    return ("option_chain", normalize_ticker(ticker), expiration_date) in _cache
+
+
+def has_history(ticker, period):
+    return ("history", normalize_ticker(ticker), period) in _cache
+
+
+def has_info(ticker):
+    return ("info", normalize_ticker(ticker)) in _cache
+
+
+def has_options(ticker):
+    return ("options", normalize_ticker(ticker)) in _cache
+
+
+# Fetch many expiries concurrently, yielding (expiry, chain, error) as each one
+# completes so callers can render progressively. Chains already in the cache (for
+# example the one the options table just displayed) are yielded first without a
+# download; only the rest go to the thread pool. Failed or timed-out expiries
+# come through with chain None and the exception in error.
+def iter_option_chains(ticker, expiration_dates, max_workers=MAX_FETCH_WORKERS, timeout=FETCH_TIMEOUT):
+    ticker = normalize_ticker(ticker)
+    started = {}
+
+    missing = []
+    for exp in expiration_dates:
+        if has_option_chain(ticker, exp):
+            yield exp, get_option_chain(ticker, exp), None
+        else:
+            missing.append(exp)
+    if not missing:
+        return
+
+    # Pool threads fetch at the caller's priority, so a background scan stays background
+    level = scheduler.current_priority()
+
+    def fetch(expiration_date):
+        started[expiration_date] = time.monotonic()
+        with scheduler.priority(level):
+            return get_option_chain(ticker, expiration_date)
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending = {pool.submit(fetch, exp): exp for exp in missing}
+        while pending:
+            done, _ = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            for future in done:
+                exp = pending.pop(future)
+                try:
+                    yield exp, future.result(), None
+                except Exception as e:
+                    yield exp, None, e
+
+            # Abandon requests that have been running longer than the timeout
+            now = time.monotonic()
+            for future, exp in list(pending.items()):
+                if exp in started and now - started[exp] > timeout:
+                    del pending[future]
+                    yield exp, None, TimeoutError(f"option_chain({ticker}, {exp}) timed out after {timeout}s")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Fetch many expiries concurrently and wait for all of them. Returns the chains
+# that arrived (in expiry order) and a dict of expiry -> exception for the ones
+# that failed or timed out, so callers can still work with partial results.
+def fetch_option_chains(ticker, expiration_dates, max_workers=MAX_FETCH_WORKERS, timeout=FETCH_TIMEOUT):
+    chains = {}
+    failed = {}
+    for exp, chain, error in iter_option_chains(ticker, expiration_dates, max_workers, timeout):
+        if error is None:
+            chains[exp] = chain
+        else:
+            failed[exp] = error
+    return {exp: chains[exp] for exp in expiration_dates if exp in chains}, failed
+
+
+# Every contract of every expiry ({expiry: chain}) as one frame, with expiration
+# and is_call columns, for analytics that work across the whole chain at once
+def chain_frame(chains):
+    frames = []
+    for expiration_date, chain in chains.items():
+        frames.append(chain.calls.assign(expiration=expiration_date, is_call=True))
+        frames.append(chain.puts.assign(expiration=expiration_date, is_call=False))
+    if not frames:
+        return pd.DataFrame(columns=["strike", "openInterest", "volume", "impliedVolatility",
+                                     "expiration", "is_call"])
+    return pd.concat(frames, ignore_index=True)
+
+
+# Hit/miss counters per endpoint plus the overall cache state
+def cache_stats():
+    with _stats_lock:
+        endpoints = {name: dict(counts) for name, counts in _endpoint_stats.items()}
+    return {"endpoints": endpoints, "cache": _cache.stats(), "singleflight": _flight.stats(),
+            "scheduler": scheduler.default_scheduler().stats()}
+
+
+def clear_cache():
+    _cache.clear()
+
+
+# Switch the data backend; responses cached from the previous one are dropped
+def set_provider(provider):
+    previous = providers.set_provider(provider)
+    clear_cache()
+    return previous
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+MAX_PAIN_COLUMNS = ["expiration", "max_pain", "call_oi", "put_oi", "payout"]
+
+
+def _strikes_and_oi(frame):
+    strikes = frame["strike"].to_numpy(dtype=np.float64)
+    open_interest = np.nan_to_num(frame["openInterest"].to_numpy(dtype=np.float64))
+    return strikes, open_interest
+
+
+# Total payout owed to option holders if the underlying settles at each candidate
+# strike, for one expiry. Every candidate is priced against every contract in one
+# broadcast (candidates x contracts) instead of a loop per strike. Returns a Series
+# of payouts indexed by strike.
+def holder_payout(chain):
+    call_strikes, call_oi = _strikes_and_oi(chain.calls)
+    put_strikes, put_oi = _strikes_and_oi(chain.puts)
+    candidates = np.unique(np.concatenate([call_strikes, put_strikes]))
+    settle = candidates[:, None]
+    payout = (np.maximum(settle - call_strikes[None, :], 0.0) @ call_oi
+              + np.maximum(put_strikes[None, :] - settle, 0.0) @ put_oi)
+    return pd.Series(payout, index=pd.Index(candidates, name="strike"), name="payout")
+
+
+# Strike at which option holders collect the least; None for an empty chain
+def max_pain(chain):
+    payout = holder_payout(chain)
+    return float(payout.idxmin()) if len(payout) else None
+
+
+# One row per expiry ({expiry: chain}, in expiry order): max-pain strike, total
+# open interest on each side and the holder payout at the max-pain strike
+def max_pain_table(chains):
+    rows = []
+    for expiration_date, chain in chains.items():
+        payout = holder_payout(chain)
+        rows.append({
+            "expiration": expiration_date,
+            "max_pain": float(payout.idxmin()) if len(payout) else np.nan,
+            "call_oi": float(np.nansum(chain.calls["openInterest"].to_numpy(dtype=np.float64))),
+            "put_oi": float(np.nansum(chain.puts["openInterest"].to_numpy(dtype=np.float64))),
+            "payout": float(payout.min()) if len(payout) else np.nan,
+        })
+    return pd.DataFrame(rows, columns=MAX_PAIN_COLUMNS)
+
+
+# Open interest by strike summed over every expiry, with call and put columns
+def oi_profile(chains):
+    strikes, call_oi, put_oi = [], [], []
+    for chain in chains.values():
+        for frame, is_call in ((chain.calls, True), (chain.puts, False)):
+            frame_strikes, open_interest = _strikes_and_oi(frame)
+            strikes.append(frame_strikes)
+            call_oi.append(open_interest if is_call else np.zeros_like(open_interest))
+            put_oi.append(np.zeros_like(open_interest) if is_call else open_interest)
+    if not strikes:
+        return pd.DataFrame(columns=["call_oi", "put_oi"], index=pd.Index([], name="strike"))
+    profile = pd.DataFrame({"strike": np.concatenate(strikes), "call_oi": np.concatenate(call_oi),
+                            "put_oi": np.concatenate(put_oi)})
+    return profile.groupby("strike").sum()
@@ -0,0 +1,99 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import market_data
+import scheduler
+from instrumentation import metrics
+
+MAX_WORKERS = 2
+# Expirations either side of the one on screen that are warmed
+NEIGHBOURS = 2
+# Expirations warmed from the stock page, for a switch to the options page
+NEAREST_EXPIRIES = 2
+
+
+# Warms the fetch cache for views the user is likely to open next, on a couple of
+# background-priority threads so it never competes with a page view for fetch
+# tokens. Work is skipped when it is already cached, already queued, or when the
+# scheduler has requests waiting (the pool only uses idle capacity).
+class Prefetcher:
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def _run(self, key, fetch):
+        try:
+            with scheduler.background():
+                fetch()
+            metrics.count("prefetch.completed")
+        except Exception:
+            metrics.count("prefetch.failed")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    # Queue fetch() under key unless it is cached or queued; returns True if queued
+    def submit(self, key, cached, fetch):
+        if cached or scheduler.default_scheduler().bucket.queued():
+            metrics.count("prefetch.skipped")
+            return False
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        metrics.count("prefetch.submitted")
+        self._executor.submit(self._run, key, fetch)
+        return True
+
+    def chain(self, ticker, expiration_date):
+        return self.submit(("option_chain", ticker, expiration_date),
+                           market_data.has_option_chain(ticker, expiration_date),
+                           lambda: market_data.get_option_chain(ticker, expiration_date))
+
+    def history(self, ticker, period):
+        return self.submit(("history", ticker, period), market_data.has_history(ticker, period),
+                           lambda: market_data.get_history(ticker, period))
+
+    def info(self, ticker):
+        return self.submit(("info", ticker), market_data.has_info(ticker), lambda: market_data.get_info(ticker))
+
+    # After the options table: the expirations either side of the selected one and
+    # the stock page's data. A chain holds both sides, so switching between calls
+    # and puts is already served from the cache.
+    def after_options(self, ticker, expiration_dates, selected, period):
+        ticker = market_data.normalize_ticker(ticker)
+        if selected in expiration_dates:
+            index = list(expiration_dates).index(selected)
+            for offset in range(1, NEIGHBOURS + 1):
+                for neighbour in (index + offset, index - offset):
+                    if 0 <= neighbour < len(expiration_dates):
+                        self.chain(ticker, expiration_dates[neighbour])
+        self.history(ticker, period)
+        self.info(ticker)
+
+    # After the stock page: the expiration list and the nearest chains
+    def after_stock(self, ticker):
+        ticker = market_data.normalize_ticker(ticker)
+
+        def warm_options():
+            for expiration_date in market_data.get_options(ticker)[:NEAREST_EXPIRIES]:
+                market_data.get_option_chain(ticker, expiration_date)
+
+        if not market_data.has_options(ticker):
+            return self.submit(("options", ticker), False, warm_options)
+        for expiration_date in market_data.get_options(ticker)[:NEAREST_EXPIRIES]:
+            self.chain(ticker, expiration_date)
+        return True
+
+
+_default_prefetcher = None
+_default_lock = threading.Lock()
+
+
+def default_prefetcher():
+    global _default_prefetcher
+    with _default_lock:
+        if _default_prefetcher is None:
+            _default_prefetcher = Prefetcher()
+        return _default_prefetcher
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from cache import TTLCache
+
+# Same shape as the object yfinance's option_chain() returns
+OptionChain = namedtuple("OptionChain", ["calls", "puts", "underlying"])
+
+# OPTIONS_APP_PROVIDER picks the backend ("yfinance" or "replay"); replay reads
+# OPTIONS_APP_FIXTURES. Setting OPTIONS_APP_RECORD to a directory records every
+# response the live backend returns in the replay layout.
+PROVIDER = os.environ.get("OPTIONS_APP_PROVIDER", "yfinance")
+FIXTURES_DIR = os.environ.get("OPTIONS_APP_FIXTURES", "fixtures")
+RECORD_DIR = os.environ.get("OPTIONS_APP_RECORD", "")
+
+
+# Interface every market-data backend implements. Tickers arrive already normalized.
+class MarketDataProvider:
+    name = "base"
+    # True for backends that go over the network and must respect the fetch rate limit
+    rate_limited = False
+    # True for real market data; only live chains are stored as snapshots or read back
+    live = False
+
+    def history(self, ticker, period):
+        raise NotImplementedError
+
+    def info(self, ticker):
+        raise NotImplementedError
+
+    def options(self, ticker):
+        raise NotImplementedError
+
+    def option_chain(self, ticker, expiration_date):
+        raise NotImplementedError
+
+
+# Live data from Yahoo Finance
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+    rate_limited = True
+    live = True
+
+    def __init__(self):
+        self._tickers = TTLCache(maxsize=1024)
+
+    def _ticker(self, ticker):
+        stock = self._tickers.get(ticker)
+        if stock is None:
+            # yfinance is heavy to import; load it on the first live fetch only
+            import yfinance as yf
+
+            stock = yf.Ticker(ticker)
+            self._tickers.set(ticker, stock, 24 * 3600)
+        return stock
+
+    def history(self, ticker, period):
+        return self._ticker(ticker).history(period=period)
+
+    def info(self, ticker):
+        return self._ticker(ticker).info
+
+    def options(self, ticker):
+        return tuple(self._ticker(ticker).options)
+
+    # Rebuilt as our OptionChain: yfinance returns its own Options namedtuple
+    def option_chain(self, ticker, expiration_date):
+        chain = self._ticker(ticker).option_chain(expiration_date)
+        return OptionChain(calls=chain.calls, puts=chain.puts, underlying=chain.underlying)
+
+
+# File names for one ticker's recorded responses:
+#   <root>/<TICKER>/info.json, options.json, history_<period>.parquet,
+#   chain_<expiry>_calls.parquet and chain_<expiry>_puts.parquet
+def _fixture_path(root, ticker, name):
+    return os.path.join(root, ticker, name)
+
+
+# Deterministic offline backend that replays recorded responses from disk.
+# latency (seconds) simulates a network round trip per call for load tests.
+class ReplayProvider(MarketDataProvider):
+    name = "replay"
+
+    def __init__(self, root=FIXTURES_DIR, latency=0.0):
+        self.root = root
+        self.latency = latency
+
+    def _path(self, ticker, name):
+        if self.latency:
+            time.sleep(self.latency)
+        path = _fixture_path(self.root, ticker, name)
+        if not os.path.exists(path):
+            raise LookupError(f"No recorded data for {ticker}: {path}")
+        return path
+
+    def history(self, ticker, period):
+        return pd.read_parquet(self._path(ticker, f"history_{period}.parquet"))
+
+    def info(self, ticker):
+        with open(self._path(ticker, "info.json")) as f:
+            return json.load(f)
+
+    def options(self, ticker):
+        with open(self._path(ticker, "options.json")) as f:
+            return tuple(json.load(f))
+
+    def option_chain(self, ticker, expiration_date):
+        calls = pd.read_parquet(self._path(ticker, f"chain_{expiration_date}_calls.parquet"))
+        puts = pd.read_parquet(_fixture_path(self.root, ticker, f"chain_{expiration_date}_puts.parquet"))
+        return OptionChain(calls=calls, puts=puts, underlying=None)
+
+
+# Pass-through wrapper that saves every response of another provider in the
+# replay layout, to build fixtures from a live session
+class RecordingProvider(MarketDataProvider):
+    def __init__(self, inner, root):
+        self.inner = inner
+        self.root = root
+        self.name = f"{inner.name}+record"
+        self.rate_limited = inner.rate_limited
+        self.live = inner.live
+
+    def _target(self, ticker, name):
+        path = _fixture_path(self.root, ticker, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def history(self, ticker, period):
+        history = self.inner.history(ticker, period)
+        history.to_parquet(self._target(ticker, f"history_{period}.parquet"))
+        return history
+
+    def info(self, ticker):
+        info = self.inner.info(ticker)
+        with open(self._target(ticker, "info.json"), "w") as f:
+            json.dump(info, f, indent=1, default=str)
+        return info
+
+    def options(self, ticker):
+        options = self.inner.options(ticker)
+        with open(self._target(ticker, "options.json"), "w") as f:
+            json.dump(list(options), f)
+        return options
+
+    def option_chain(self, ticker, expiration_date):
+        chain = self.inner.option_chain(ticker, expiration_date)
+        chain.calls.to_parquet(self._target(ticker, f"chain_{expiration_date}_calls.parquet"))
+        chain.puts.to_parquet(self._target(ticker, f"chain_{expiration_date}_puts.parquet"))
+        return chain
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def _configured_provider():
+    if PROVIDER == "yfinance":
+        provider = YFinanceProvider()
+    elif PROVIDER == "replay":
+        provider = ReplayProvider(FIXTURES_DIR)
+    else:
+        raise ValueError(f"Unknown OPTIONS_APP_PROVIDER {PROVIDER!r}")
+    if RECORD_DIR:
+        provider = RecordingProvider(provider, RECORD_DIR)
+    return provider
+
+
+# Process-wide provider, built from the environment on first use
+def get_provider():
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = _configured_provider()
+        return _provider
+
+
+# Swap the backend at runtime (benchmarks, load tests); returns the previous one
+def set_provider(provider):
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    return previous
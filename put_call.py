@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# Shares per listed equity option contract
+CONTRACT_MULTIPLIER = 100
+# Each variant is the put total over the call total of one measure
+RATIO_KINDS = ["volume", "open_interest", "premium"]
+EXPIRY_COLUMNS = ["expiration"] + [f"{kind}_ratio" for kind in RATIO_KINDS]
+
+
+# Dollar premium traded per contract: volume x last price x multiplier
+def premium(volume, last_price):
+    return volume * last_price * CONTRACT_MULTIPLIER
+
+
+# Volume, open interest and dollar premium traded of one side, summed in float64
+# whatever the stored dtype with missing values as zero
+def _side_totals(frame):
+    volume = np.nan_to_num(frame["volume"].to_numpy(dtype=np.float64))
+    open_interest = np.nan_to_num(frame["openInterest"].to_numpy(dtype=np.float64))
+    last_price = np.nan_to_num(frame["lastPrice"].to_numpy(dtype=np.float64))
+    return np.array([volume.sum(), open_interest.sum(), premium(volume, last_price).sum()])
+
+
+def _ratios(puts, calls):
+    return {kind: float(put / call) if call > 0 else None for kind, put, call in zip(RATIO_KINDS, puts, calls)}
+
+
+# Running put/call totals, fed one chain at a time as expiries arrive. Every
+# variant comes from the same pass over each chain, and per-expiry totals are
+# kept so the breakdown needs no second pass either.
+class PutCallAccumulator:
+    def __init__(self):
+        self.calls = np.zeros(len(RATIO_KINDS))
+        self.puts = np.zeros(len(RATIO_KINDS))
+        self.expirations = 0
+        self._by_expiry = []
+
+    def add(self, option_chain, expiration_date=None):
+        calls = _side_totals(option_chain.calls)
+        puts = _side_totals(option_chain.puts)
+        self.calls += calls
+        self.puts += puts
+        self.expirations += 1
+        self._by_expiry.append((expiration_date, puts, calls))
+
+    # Put/call volume ratio so far; None without call volume
+    @property
+    def ratio(self):
+        return self.ratios()["volume"]
+
+    # {kind: ratio} over every chain added so far; None where the call total is zero
+    def ratios(self):
+        return _ratios(self.puts, self.calls)
+
+    # One row per chain added, in expiry order when the expiration dates were given
+    def per_expiry(self):
+        rows = []
+        for expiration_date, puts, calls in self._by_expiry:
+            rows.append(dict(expiration=expiration_date,
+                             **{f"{kind}_ratio": value for kind, value in _ratios(puts, calls).items()}))
+        # None (no call side) becomes NaN so the ratio columns stay numeric
+        frame = pd.DataFrame(rows, columns=EXPIRY_COLUMNS).astype({column: np.float64 for column in EXPIRY_COLUMNS[1:]})
+        if frame["expiration"].notna().all():
+            frame = frame.sort_values("expiration", ignore_index=True)
+        return frame
+
+
+# Put/call volume ratio over a set of chains ({expiry: chain}); None without call volume
+def volume_ratio(chains):
+    accumulator = PutCallAccumulator()
+    for option_chain in chains.values():
+        accumulator.add(option_chain)
+    return accumulator.ratio
+
+
+# Every ratio variant over a set of chains, in aggregate and per expiry
+def ratio_summary(chains):
+    accumulator = PutCallAccumulator()
+    for expiration_date, option_chain in chains.items():
+        accumulator.add(option_chain, expiration_date)
+    return accumulator.ratios(), accumulator.per_expiry()
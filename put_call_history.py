@@ -0,0 +1,125 @@
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import pandas as pd
+
+import put_call
+
+logger = logging.getLogger(__name__)
+
+# Set OPTIONS_APP_HISTORY_DB to an empty string to stop recording ratios
+HISTORY_DB = os.environ.get("OPTIONS_APP_HISTORY_DB", "put_call_history.sqlite")
+
+# A ticker is sampled at most this often (seconds), so page reruns served from
+# the chain cache don't record the same ratio over and over
+MIN_INTERVAL = 2 * 60
+
+HISTORY_COLUMNS = ["ts"] + put_call.RATIO_KINDS + ["expirations"]
+
+# Keyed on (ticker, ts) without a rowid, so the rows of one ticker are stored in
+# time order and a time-range query is a single index range scan
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS put_call_ratios (
+    ticker TEXT NOT NULL,
+    ts REAL NOT NULL,
+    volume REAL,
+    open_interest REAL,
+    premium REAL,
+    expirations INTEGER,
+    PRIMARY KEY (ticker, ts)
+) WITHOUT ROWID
+"""
+
+
+def _epoch(value):
+    return pd.Timestamp(value).timestamp() if value is not None else None
+
+
+# Append-only SQLite log of computed put/call ratios. Each call opens its own
+# connection, so the store can be used from any Streamlit session thread.
+class PutCallHistory:
+    def __init__(self, path):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            # WAL lets page views read while another session appends
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(_SCHEMA)
+            connection.commit()
+            self._initialized = True
+        return connection
+
+    # Record one sample; returns False when the ticker was sampled less than
+    # min_interval seconds before ts
+    def append(self, ticker, ratios, expirations, ts=None, min_interval=MIN_INTERVAL):
+        ts = time.time() if ts is None else _epoch(ts)
+        with closing(self._connect()) as connection, connection:
+            if min_interval:
+                row = connection.execute("SELECT MAX(ts) FROM put_call_ratios WHERE ticker = ?", (ticker,)).fetchone()
+                if row[0] is not None and ts - row[0] < min_interval:
+                    return False
+            connection.execute(
+                "INSERT OR IGNORE INTO put_call_ratios VALUES (?, ?, ?, ?, ?, ?)",
+                (ticker, ts, *(ratios.get(kind) for kind in put_call.RATIO_KINDS), expirations),
+            )
+        return True
+
+    # Samples for one ticker between start and end (anything pandas reads as a
+    # timestamp), oldest first, with ts as UTC timestamps
+    def query(self, ticker, start=None, end=None):
+        sql = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM put_call_ratios WHERE ticker = ?"
+        params = [ticker]
+        if start is not None:
+            sql += " AND ts >= ?"
+            params.append(_epoch(start))
+        if end is not None:
+            sql += " AND ts <= ?"
+            params.append(_epoch(end))
+        with closing(self._connect()) as connection:
+            rows = connection.execute(sql + " ORDER BY ts", params).fetchall()
+        frame = pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+        frame["ts"] = pd.to_datetime(frame["ts"], unit="s", utc=True)
+        return frame
+
+
+_default_history = None
+
+
+# History configured through OPTIONS_APP_HISTORY_DB, or None when disabled
+def default_history():
+    global _default_history
+    if not HISTORY_DB:
+        return None
+    if _default_history is None:
+        _default_history = PutCallHistory(HISTORY_DB)
+    return _default_history
+
+
+# Record ratios in the default history; a locked or unwritable database must never break a page view
+def record_ratios(ticker, ratios, expirations):
+    history = default_history()
+    if history is None:
+        return False
+    try:
+        return history.append(ticker, ratios, expirations)
+    except sqlite3.Error as e:
+        logger.warning("Could not record put/call ratio for %s: %s", ticker, e)
+        return False
+
+
+# Samples for one ticker from the default history; None when disabled or unreadable
+def ticker_history(ticker, start=None, end=None):
+    history = default_history()
+    if history is None:
+        return None
+    try:
+        return history.query(ticker, start, end)
+    except sqlite3.Error as e:
+        logger.warning("Could not read put/call history for %s: %s", ticker, e)
+        return None
@@ -0,0 +1,269 @@
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from instrumentation import metrics
+
+# Upstream request rate (per second) and burst for rate-limited providers;
+# OPTIONS_APP_FETCH_RATE=0 turns the limit off
+RATE_PER_SECOND = float(os.environ.get("OPTIONS_APP_FETCH_RATE", "8"))
+BURST = int(os.environ.get("OPTIONS_APP_FETCH_BURST", "20"))
+
+# Retries per call, and backoff bounds in seconds (full jitter between 0 and the bound)
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+# Each key may retry at most RETRY_BUDGET times per RETRY_WINDOW seconds, across
+# all calls, so a persistently failing ticker can't turn into a retry storm
+RETRY_BUDGET = 6
+RETRY_WINDOW = 60.0
+# After a throttling response the bucket hands out no tokens for this long
+THROTTLE_PAUSE = 5.0
+
+# Lower runs first: page views ahead of scans and prefetches
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_local = threading.local()
+
+
+# A priority that can be raised while its request is already queued, e.g. when a
+# page view joins a fetch a background scan started; buckets holding it re-sort
+class Priority:
+    def __init__(self, level=INTERACTIVE):
+        self.level = level
+        self._lock = threading.Lock()
+        self._buckets = set()
+
+    def raise_to(self, level):
+        with self._lock:
+            if level >= self.level:
+                return
+            self.level = level
+            buckets = list(self._buckets)
+        for bucket in buckets:
+            bucket.reorder()
+
+    def _watch(self, bucket):
+        with self._lock:
+            self._buckets.add(bucket)
+
+    def _unwatch(self, bucket):
+        with self._lock:
+            self._buckets.discard(bucket)
+
+
+def _level(level):
+    return level.level if isinstance(level, Priority) else level
+
+
+# Fetches made by this thread inside the block queue at the given priority (a
+# level, or a Priority to follow as it is raised)
+@contextmanager
+def priority(level):
+    previous = getattr(_local, "priority", INTERACTIVE)
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def background():
+    return priority(BACKGROUND)
+
+
+def current_priority():
+    return _level(getattr(_local, "priority", INTERACTIVE))
+
+
+# Rate-limit responses from Yahoo come back as HTTP 429 or yfinance's own error.
+# 429 only counts as a whole token: error messages also carry epoch timestamps and
+# contract symbols that can contain those digits.
+def is_throttle(error):
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return ("ratelimit" in text or "rate limit" in text or "too many requests" in text
+            or re.search(r"\b429\b", text) is not None)
+
+
+# Network trouble, server errors and throttling are worth retrying; bad tickers
+# and missing data are not. yfinance raises requests' own exception types, which
+# don't derive from the builtin ConnectionError/TimeoutError.
+def is_retryable(error):
+    # Imported here so requests loads with the first failure rather than at startup
+    import requests
+
+    if is_throttle(error) or isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(error, requests.exceptions.HTTPError) and status is not None and status >= 500
+
+
+# Token bucket whose tokens are granted strictly in (priority, arrival) order:
+# only the head of the queue may take a token, so a background scan can't starve
+# a page view of its next request. The head is re-evaluated on every wakeup, so a
+# waiter whose Priority is raised moves up the queue.
+class TokenBucket:
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _head(self):
+        return min(self._waiters, key=lambda entry: (entry[1].level, entry[0]))
+
+    # Block until a token is granted; returns the seconds spent waiting. level is
+    # a plain level or a Priority that may be raised while this call waits.
+    def acquire(self, level=INTERACTIVE):
+        if not self.rate:
+            return 0.0
+        start = self._clock()
+        level = level if isinstance(level, Priority) else Priority(level)
+        entry = (next(self._sequence), level)
+        level._watch(self)
+        try:
+            with self._condition:
+                self._waiters.append(entry)
+                while True:
+                    now = self._clock()
+                    self._refill(now)
+                    head = self._head() is entry
+                    if head and now >= self._paused_until and self._tokens >= 1:
+                        self._waiters.remove(entry)
+                        self._tokens -= 1
+                        self._condition.notify_all()
+                        return self._clock() - start
+                    if not head:
+                        self._condition.wait()
+                    else:
+                        wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+                        self._condition.wait(max(wait, 0.001))
+        finally:
+            level._unwatch(self)
+
+    # Wake waiters to re-check the head after a queued Priority was raised
+    def reorder(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    # Stop granting tokens for a while, e.g. after the provider reported throttling
+    def pause(self, seconds):
+        with self._condition:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._tokens = 0.0
+            self._condition.notify_all()
+
+    def queued(self):
+        with self._condition:
+            return len(self._waiters)
+
+
+# Central gate for upstream requests: rate limit, priority, retries with jittered
+# exponential backoff under a per-key budget, and counters for the debug panel
+class FetchScheduler:
+    def __init__(self, rate=RATE_PER_SECOND, burst=BURST, max_retries=MAX_RETRIES,
+                 retry_budget=RETRY_BUDGET, retry_window=RETRY_WINDOW, clock=time.monotonic, sleep=time.sleep):
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.retry_window = retry_window
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._retries_by_key = {}
+        self._started = clock()
+        self._stats = {"requests": 0, "completed": 0, "failed": 0, "retries": 0, "throttled": 0,
+                       "budget_exhausted": 0, "queue_wait": 0.0}
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self._stats[name] += value
+        metrics.count(f"scheduler.{name}", value)
+
+    # Spend one retry of key's budget; False when the budget is used up
+    def _take_retry(self, key):
+        now = self._clock()
+        with self._lock:
+            recent = self._retries_by_key.setdefault(key, deque())
+            while recent and now - recent[0] > self.retry_window:
+                recent.popleft()
+            if len(recent) >= self.retry_budget:
+                return False
+            recent.append(now)
+            return True
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    # Run fn for key, waiting for a token first when rate_limited. Retryable errors
+    # are retried after a jittered backoff while the key has budget left; the last
+    # error is raised otherwise.
+    def call(self, key, fn, rate_limited=True, level=None):
+        level = getattr(_local, "priority", INTERACTIVE) if level is None else level
+        self._count("requests")
+        attempt = 0
+        while True:
+            if rate_limited:
+                self._count("queue_wait", self.bucket.acquire(level))
+            try:
+                value = fn()
+            except Exception as e:
+                if is_throttle(e):
+                    self._count("throttled")
+                    if rate_limited:
+                        self.bucket.pause(THROTTLE_PAUSE)
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    self._count("failed")
+                    raise
+                if not self._take_retry(key):
+                    self._count("budget_exhausted")
+                    self._count("failed")
+                    raise
+                self._count("retries")
+                self._sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            self._count("completed")
+            return value
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        elapsed = max(self._clock() - self._started, 1e-9)
+        stats["throughput_per_s"] = stats["completed"] / elapsed
+        stats["queued"] = self.bucket.queued()
+        stats["rate_per_s"] = self.bucket.rate
+        return stats
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler():
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            # Read at first use, so a process can lower them beforehand (cli.py workers)
+            _default_scheduler = FetchScheduler(RATE_PER_SECOND, BURST)
+        return _default_scheduler
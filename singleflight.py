@@ -0,0 +1,62 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+        self.on_join = None
+
+
+# Collapses concurrent calls for the same key into one: the first caller (the
+# leader) runs fn, and every caller that arrives before it finishes waits and gets
+# the same value, or the same exception re-raised. Nothing is remembered after
+# the call completes; caching the result is the caller's business.
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.shared = 0
+
+    # Returns (value, shared), where shared is True for callers that waited on
+    # another caller's fetch. The leader's on_join, if given, is called with the
+    # level of every caller that joins its flight, so an urgent caller can raise
+    # the priority of a fetch a background caller started.
+    def do(self, key, fn, level=None, on_join=None):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                call.on_join = on_join
+                self.leaders += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            if call.on_join is not None and level is not None:
+                call.on_join(level)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def stats(self):
+        with self._lock:
+            return {"leaders": self.leaders, "shared": self.shared, "in_flight": len(self._calls)}
@@ -0,0 +1,180 @@
+import glob
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+import providers
+from providers import OptionChain
+
+logger = logging.getLogger(__name__)
+
+# Set OPTIONS_APP_SNAPSHOT_DIR to an empty string to turn snapshots off
+SNAPSHOT_DIR = os.environ.get("OPTIONS_APP_SNAPSHOT_DIR", "snapshots")
+
+# Fixed file schema so every snapshot unifies into one dataset, even when a
+# chain arrives with an all-null column
+CHAIN_SCHEMA = pa.schema([
+    ("contractSymbol", pa.string()),
+    ("lastTradeDate", pa.timestamp("ns", tz="UTC")),
+    ("strike", pa.float64()),
+    ("lastPrice", pa.float64()),
+    ("bid", pa.float64()),
+    ("ask", pa.float64()),
+    ("change", pa.float64()),
+    ("percentChange", pa.float64()),
+    ("volume", pa.float64()),
+    ("openInterest", pa.float64()),
+    ("impliedVolatility", pa.float64()),
+    ("inTheMoney", pa.bool_()),
+    ("contractSize", pa.string()),
+    ("currency", pa.string()),
+    ("side", pa.string()),
+    ("fetched_at", pa.timestamp("us", tz="UTC")),
+])
+
+# ticker=/date=/expiry= directories; all kept as strings so "2026-10-23" is not parsed
+PARTITIONING = ds.partitioning(
+    pa.schema([("ticker", pa.string()), ("date", pa.string()), ("expiry", pa.string())]),
+    flavor="hive",
+)
+_DATASET_SCHEMA = pa.schema(list(CHAIN_SCHEMA) + list(PARTITIONING.schema))
+
+_FILE_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+def _side_table(frame, side, fetched_at):
+    columns = {}
+    for field in CHAIN_SCHEMA:
+        if field.name == "side":
+            columns[field.name] = pa.array([side] * len(frame), type=field.type)
+        elif field.name == "fetched_at":
+            columns[field.name] = pa.array([fetched_at] * len(frame), type=field.type)
+        elif field.name in frame:
+            values = frame[field.name]
+            if values.dtype == "category":
+                values = values.astype(object)
+            columns[field.name] = pa.Array.from_pandas(values, type=field.type)
+        else:
+            columns[field.name] = pa.nulls(len(frame), type=field.type)
+    return pa.table(columns, schema=CHAIN_SCHEMA)
+
+
+# Append-only Parquet store of fetched option chains, one file per fetch under
+# <root>/ticker=<T>/date=<fetch date>/expiry=<E>/
+class SnapshotStore:
+    def __init__(self, root):
+        self.root = root
+
+    def _partition(self, ticker, date, expiry):
+        return os.path.join(self.root, f"ticker={ticker}", f"date={date}", f"expiry={expiry}")
+
+    def append(self, ticker, expiry, chain, fetched_at=None):
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        table = pa.concat_tables([
+            _side_table(chain.calls, "call", fetched_at),
+            _side_table(chain.puts, "put", fetched_at),
+        ])
+        directory = self._partition(ticker, fetched_at.strftime("%Y-%m-%d"), expiry)
+        os.makedirs(directory, exist_ok=True)
+        name = fetched_at.strftime(_FILE_TIME_FORMAT) + ".parquet"
+        path = os.path.join(directory, name)
+        # Write to a dot-file (ignored by dataset discovery) then rename, so readers
+        # never see a half-written snapshot
+        tmp_path = os.path.join(directory, "." + name + ".tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        return path
+
+    # Most recent snapshot of one expiry if it is at most max_age seconds old. With
+    # max_age only the date partitions that window can reach are listed (today's,
+    # plus yesterday's just after UTC midnight), not every date ever recorded.
+    def latest(self, ticker, expiry, max_age=None):
+        now = datetime.now(timezone.utc)
+        if max_age is None:
+            dates = ["*"]
+        else:
+            dates = sorted({(now - timedelta(seconds=max_age)).strftime("%Y-%m-%d"), now.strftime("%Y-%m-%d")})
+        paths = []
+        for date in dates:
+            paths.extend(glob.glob(os.path.join(self._partition(ticker, date, expiry), "*.parquet")))
+        if not paths:
+            return None
+        path = max(paths, key=os.path.basename)
+        fetched_at = datetime.strptime(os.path.basename(path)[:-len(".parquet")], _FILE_TIME_FORMAT)
+        age = (now - fetched_at.replace(tzinfo=timezone.utc)).total_seconds()
+        if max_age is not None and age > max_age:
+            return None
+        frame = pq.read_table(path, memory_map=True).to_pandas()
+        side = frame.pop("side")
+        frame = frame.drop(columns="fetched_at")
+        return OptionChain(
+            calls=frame[side == "call"].reset_index(drop=True),
+            puts=frame[side == "put"].reset_index(drop=True),
+            underlying=None,
+        )
+
+    def dataset(self):
+        return ds.dataset(self.root, format="parquet", partitioning=PARTITIONING, schema=_DATASET_SCHEMA,
+                          filesystem=fs.LocalFileSystem(use_mmap=True))
+
+    # Query snapshots without loading whole files: partition directories are pruned
+    # by ticker/expiry/date and Parquet row-group statistics skip strikes and fetch
+    # times outside the requested ranges. Files are memory-mapped.
+    def read(self, ticker=None, expiry=None, min_strike=None, max_strike=None,
+             start=None, end=None, side=None, columns=None):
+        if not os.path.isdir(self.root):
+            return _DATASET_SCHEMA.empty_table().to_pandas()
+        conditions = []
+        if ticker is not None:
+            tickers = [ticker] if isinstance(ticker, str) else list(ticker)
+            conditions.append(ds.field("ticker").isin(tickers))
+        if expiry is not None:
+            expiries = [expiry] if isinstance(expiry, str) else list(expiry)
+            conditions.append(ds.field("expiry").isin(expiries))
+        if min_strike is not None:
+            conditions.append(ds.field("strike") >= min_strike)
+        if max_strike is not None:
+            conditions.append(ds.field("strike") <= max_strike)
+        if start is not None:
+            conditions.append(ds.field("date") >= start.strftime("%Y-%m-%d"))
+            conditions.append(ds.field("fetched_at") >= pa.scalar(start, type=CHAIN_SCHEMA.field("fetched_at").type))
+        if end is not None:
+            conditions.append(ds.field("date") <= end.strftime("%Y-%m-%d"))
+            conditions.append(ds.field("fetched_at") <= pa.scalar(end, type=CHAIN_SCHEMA.field("fetched_at").type))
+        if side is not None:
+            conditions.append(ds.field("side") == side)
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return self.dataset().to_table(columns=columns, filter=expression).to_pandas()
+
+_default_store = None
+
+
+# Store configured through OPTIONS_APP_SNAPSHOT_DIR, or None when disabled or the
+# current provider isn't live: replay and synthetic chains under real tickers
+# must never be served as live data or averaged into volume baselines
+def default_store():
+    global _default_store
+    if not SNAPSHOT_DIR or not providers.get_provider().live:
+        return None
+    if _default_store is None:
+        _default_store = SnapshotStore(SNAPSHOT_DIR)
+    return _default_store
+
+
+# Append a chain to the default store; a full disk or bad file must never break a page view
+def record_chain(ticker, expiry, chain):
+    store = default_store()
+    if store is None:
+        return
+    try:
+        store.append(ticker, expiry, chain)
+    except (OSError, pa.ArrowException) as e:
+        logger.warning("Could not write snapshot for %s %s: %s", ticker, expiry, e)
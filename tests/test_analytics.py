@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+import analytics
+import market_data
+import providers
+
+NOW = pd.Timestamp("2026-10-16 20:00", tz="UTC")
+EXPIRIES = ("2026-11-20", "2026-12-18", "2027-01-15")
+
+
+def _side(expiry, letter):
+    strikes = [90.0, 100.0, 110.0]
+    return pd.DataFrame({
+        "contractSymbol": [f"X{expiry}{letter}{int(k)}" for k in strikes],
+        "strike": strikes,
+        "lastPrice": [5.0, 2.0, 0.5],
+        "bid": [4.9, 1.9, 0.4],
+        "ask": [5.1, 2.1, 0.6],
+        "volume": [10.0, 20.0, 30.0],
+        "openInterest": [100.0, 200.0, 300.0],
+        "impliedVolatility": [0.3, 0.25, 0.3],
+    })
+
+
+class FlakyProvider(providers.MarketDataProvider):
+    name = "flaky"
+
+    def __init__(self, failing):
+        self.failing = failing
+
+    def history(self, ticker, period):
+        return pd.DataFrame({"Close": [100.0]}, index=[NOW])
+
+    def options(self, ticker):
+        return EXPIRIES
+
+    def option_chain(self, ticker, expiration_date):
+        if expiration_date in self.failing:
+            raise KeyError(expiration_date)
+        return providers.OptionChain(calls=_side(expiration_date, "C"), puts=_side(expiration_date, "P"),
+                                     underlying=None)
+
+
+@pytest.fixture
+def use_provider():
+    previous = providers.get_provider()
+
+    def use(provider):
+        market_data.set_provider(provider)
+
+    yield use
+    market_data.set_provider(previous)
+
+
+def test_ticker_report_keeps_the_expirations_that_arrived(use_provider):
+    use_provider(FlakyProvider(failing={"2026-12-18"}))
+    report = analytics.ticker_report("X", 0.045, now=NOW)
+    summary = report["summary"]
+    assert summary["expirations"] == 2
+    assert summary["failed_expirations"] == "2026-12-18"
+    assert set(report["contracts"]["expiration"]) == {"2026-11-20", "2027-01-15"}
+
+
+def test_ticker_report_raises_when_every_expiration_failed(use_provider):
+    use_provider(FlakyProvider(failing=set(EXPIRIES)))
+    with pytest.raises(RuntimeError):
+        analytics.ticker_report("X", 0.045, now=NOW)
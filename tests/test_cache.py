@@ -0,0 +1,121 @@
+import time
+from collections import namedtuple
+
+import pandas as pd
+import pytest
+
+import cache_backend
+import market_data
+import providers
+from cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingProvider(providers.MarketDataProvider):
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def info(self, ticker):
+        self.calls += 1
+        return {"symbol": ticker}
+
+
+def test_peek_skips_counters_and_respects_expiry():
+    clock = FakeClock()
+    cache = TTLCache(clock=clock)
+    cache.set("k", 1, ttl=10)
+    assert cache.peek("k") == 1
+    assert cache.peek("missing", "default") == "default"
+    clock.now = 10
+    assert cache.peek("k") is None
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_cold_fetch_counts_one_miss(monkeypatch):
+    monkeypatch.setattr(market_data, "_shared_backend", lambda: None)
+    provider = CountingProvider()
+    previous = market_data.set_provider(provider)
+    try:
+        before = market_data._cache.stats()
+        assert market_data.get_info("aapl") == {"symbol": "AAPL"}
+        after = market_data._cache.stats()
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 0
+
+        market_data.get_info("AAPL")
+        assert market_data._cache.stats()["hits"] - after["hits"] == 1
+        assert provider.calls == 1
+    finally:
+        market_data.set_provider(previous)
+
+
+def test_shared_keys_are_namespaced_by_provider():
+    key = ("info", "AAPL")
+    assert cache_backend.encode_key("replay", key) != cache_backend.encode_key("yfinance", key)
+    assert cache_backend.encode_key("yfinance", key).startswith(f"v{cache_backend.FORMAT_VERSION}|yfinance|")
+
+
+CALLS = pd.DataFrame({"contractSymbol": ["X240119C00100000"], "strike": [100.0], "lastPrice": [8.04]})
+PUTS = CALLS.assign(contractSymbol=["X240119P00100000"], lastPrice=[1.5])
+# Same shape as yfinance's own Options namedtuple, which is not our OptionChain
+ForeignOptions = namedtuple("Options", ["calls", "puts", "underlying"])
+
+
+@pytest.fixture(params=["sqlite", "resp"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        yield cache_backend.SQLiteBackend(str(tmp_path / "cache.db"))
+        return
+    server = cache_backend.RespStandIn()
+    host, port = server.start()
+    client = cache_backend.RedisBackend(host, port)
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _round_trip(backend, value):
+    key = cache_backend.encode_key("test", ("value",))
+    backend.set(key, cache_backend.serialize(value), 60)
+    data, ttl_left = backend.get(key)
+    assert 0 < ttl_left <= 60
+    return cache_backend.deserialize(data)
+
+
+def test_frame_round_trip(backend):
+    pd.testing.assert_frame_equal(_round_trip(backend, CALLS), CALLS)
+
+
+@pytest.mark.parametrize("chain_class", [providers.OptionChain, ForeignOptions])
+def test_chain_round_trip(backend, chain_class):
+    restored = _round_trip(backend, chain_class(calls=CALLS, puts=PUTS, underlying={"regularMarketPrice": 101.0}))
+    assert isinstance(restored, providers.OptionChain)
+    pd.testing.assert_frame_equal(restored.calls, CALLS)
+    pd.testing.assert_frame_equal(restored.puts, PUTS)
+
+
+def test_json_round_trip(backend):
+    value = {"shortName": "X", "expirations": ["2024-01-19"]}
+    assert _round_trip(backend, value) == value
+
+
+def test_missing_and_expired_keys_are_misses(backend):
+    assert backend.get("absent") is None
+    backend.set("short", b"J1", 0.001)
+    time.sleep(0.01)
+    assert backend.get("short") is None
+
+
+def test_frame_inside_json_is_rejected():
+    with pytest.raises(TypeError):
+        cache_backend.serialize({"chain": CALLS})
@@ -0,0 +1,21 @@
+import numpy as np
+
+import greeks
+
+
+def test_compute_greeks_matches_naive_reference():
+    strikes = np.array([80.0, 95.0, 100.0, 105.0, 130.0])
+    t = np.array([0.02, 0.1, 0.25, 0.5, 2.0])
+    vols = np.array([0.6, 0.3, 0.2, 0.25, 0.4])
+    for is_call in (True, False):
+        vectorized = greeks.compute_greeks(100.0, strikes, t, 0.045, vols, is_call, dividend_yield=0.01)
+        for i in range(len(strikes)):
+            expected = greeks.naive_greeks(100.0, strikes[i], t[i], 0.045, vols[i], is_call, dividend_yield=0.01)
+            for name in greeks.GREEK_COLUMNS:
+                np.testing.assert_allclose(vectorized[name][i], expected[name], rtol=1e-9, atol=1e-12)
+
+
+def test_missing_or_zero_vol_gives_nan():
+    values = greeks.compute_greeks(100.0, [100.0, 100.0], 0.25, 0.045, [0.0, np.nan], True)
+    for name in greeks.GREEK_COLUMNS:
+        assert np.isnan(values[name]).all()
@@ -0,0 +1,23 @@
+import numpy as np
+
+import greeks
+import implied_vol
+
+
+def test_recovers_known_vols():
+    strikes = np.array([60.0, 90.0, 100.0, 110.0, 160.0])
+    t = np.array([0.05, 0.25, 0.5, 1.0, 2.0])
+    vols = np.array([0.8, 0.35, 0.2, 0.25, 0.5])
+    for is_call in (True, False):
+        prices = greeks.black_scholes_price(100.0, strikes, t, 0.045, vols, is_call)
+        result = implied_vol.solve_implied_vol(prices, 100.0, strikes, t, 0.045, is_call)
+        assert result["converged"].all()
+        np.testing.assert_allclose(result["iv"], vols, atol=1e-5)
+
+
+def test_prices_outside_no_arbitrage_bounds_are_not_converged():
+    # Below intrinsic (deep in-the-money call), above the spot, and a missing price
+    result = implied_vol.solve_implied_vol([10.0, 150.0, np.nan], 100.0, [80.0, 100.0, 100.0], 0.5, 0.045, True)
+    assert not result["converged"].any()
+    assert np.isnan(result["iv"]).all()
+    assert (result["iterations"] == 0).all()
@@ -0,0 +1,16 @@
+import pandas as pd
+
+import max_pain
+import providers
+
+
+def test_holder_payout_on_a_three_strike_chain():
+    calls = pd.DataFrame({"strike": [90.0, 100.0, 110.0], "openInterest": [10.0, 20.0, 30.0]})
+    puts = pd.DataFrame({"strike": [90.0, 100.0, 110.0], "openInterest": [5.0, 15.0, 25.0]})
+    chain = providers.OptionChain(calls=calls, puts=puts, underlying=None)
+
+    payout = max_pain.holder_payout(chain)
+    # Settle at 90: puts pay 10 x 15 + 20 x 25; at 100: calls 10 x 10, puts 10 x 25;
+    # at 110: calls 20 x 10 + 10 x 20
+    assert payout.to_dict() == {90.0: 650.0, 100.0: 350.0, 110.0: 400.0}
+    assert max_pain.max_pain(chain) == 100.0
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import providers
+import put_call
+
+
+def _side(volume, open_interest, last_price):
+    return pd.DataFrame({"volume": volume, "openInterest": open_interest, "lastPrice": last_price})
+
+
+def test_accumulator_treats_missing_volume_as_zero():
+    accumulator = put_call.PutCallAccumulator()
+    accumulator.add(providers.OptionChain(calls=_side([100.0, np.nan], [1000.0, 500.0], [2.0, 1.0]),
+                                          puts=_side([np.nan, 50.0], [np.nan, 750.0], [3.0, 4.0]),
+                                          underlying=None), "2026-11-20")
+    accumulator.add(providers.OptionChain(calls=_side([np.nan], [0.0], [1.0]),
+                                          puts=_side([20.0], [10.0], [0.5]),
+                                          underlying=None), "2026-12-18")
+
+    ratios = accumulator.ratios()
+    assert ratios["volume"] == pytest.approx(70 / 100)
+    assert ratios["open_interest"] == pytest.approx(760 / 1500)
+    assert ratios["premium"] == pytest.approx((50 * 4.0 + 20 * 0.5) / (100 * 2.0))
+
+    per_expiry = accumulator.per_expiry()
+    assert per_expiry["volume_ratio"].iloc[0] == pytest.approx(0.5)
+    # No call volume at all in the second expiry: NaN, not an error or inf
+    assert np.isnan(per_expiry["volume_ratio"].iloc[1])
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import requests
+
+import scheduler
+from singleflight import SingleFlight
+
+
+def test_is_throttle_matches_429_only_as_a_status_code():
+    assert scheduler.is_throttle(Exception("HTTP Error 429: Too Many Requests"))
+    assert scheduler.is_throttle(Exception("429 Client Error"))
+    assert not scheduler.is_throttle(Exception("HTTP Error 404: $AAPL240429C00150000 possibly delisted"))
+    assert not scheduler.is_throttle(Exception("no data after 1714290000"))
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(f"{status} error", response=response)
+
+
+def test_is_retryable_covers_requests_network_errors_and_5xx():
+    assert scheduler.is_retryable(requests.exceptions.ReadTimeout())
+    assert scheduler.is_retryable(requests.exceptions.ConnectTimeout())
+    assert scheduler.is_retryable(requests.exceptions.ConnectionError())
+    assert scheduler.is_retryable(_http_error(503))
+    assert scheduler.is_retryable(_http_error(429))
+    assert not scheduler.is_retryable(_http_error(404))
+    assert not scheduler.is_retryable(KeyError("regularMarketPrice"))
+
+
+def test_raised_priority_moves_a_queued_request_ahead():
+    bucket = scheduler.TokenBucket(rate=10, burst=1)
+    bucket.acquire()
+    order = []
+    first = scheduler.Priority(scheduler.BACKGROUND)
+    second = scheduler.Priority(scheduler.BACKGROUND)
+
+    def wait_for_token(name, level):
+        bucket.acquire(level)
+        order.append(name)
+
+    threads = [threading.Thread(target=wait_for_token, args=("first", first))]
+    threads[0].start()
+    while bucket.queued() < 1:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=wait_for_token, args=("second", second)))
+    threads[1].start()
+    while bucket.queued() < 2:
+        time.sleep(0.001)
+    second.raise_to(scheduler.INTERACTIVE)
+    for thread in threads:
+        thread.join(5)
+    assert order == ["second", "first"]
+
+
+def test_joining_caller_raises_the_flight_priority():
+    flight = SingleFlight()
+    level = scheduler.Priority(scheduler.BACKGROUND)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "value"
+
+    leader = threading.Thread(target=flight.do, args=("key", slow),
+                              kwargs={"level": level.level, "on_join": level.raise_to})
+    leader.start()
+    started.wait(5)
+    joiner = threading.Thread(target=flight.do, args=("key", slow), kwargs={"level": scheduler.INTERACTIVE})
+    joiner.start()
+    while flight.stats()["shared"] < 1:
+        time.sleep(0.001)
+    deadline = time.monotonic() + 5
+    while level.level != scheduler.INTERACTIVE and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    leader.join(5)
+    joiner.join(5)
+    assert level.level == scheduler.INTERACTIVE
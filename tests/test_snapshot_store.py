@@ -0,0 +1,20 @@
+import market_data
+import providers
+import snapshot_store
+
+
+class LiveProvider(providers.MarketDataProvider):
+    name = "live"
+    live = True
+
+
+def test_snapshots_are_only_used_for_live_providers(monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshot_store, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(snapshot_store, "_default_store", None)
+    previous = market_data.set_provider(providers.ReplayProvider(str(tmp_path)))
+    try:
+        assert snapshot_store.default_store() is None
+        market_data.set_provider(LiveProvider())
+        assert snapshot_store.default_store().root == str(tmp_path)
+    finally:
+        market_data.set_provider(previous)
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import put_call
+
+# A contract is flagged when any one of these is exceeded
+VOLUME_OI_RATIO = 2.0
+BASELINE_MULTIPLE = 3.0
+MIN_PREMIUM = 250_000.0
+# Contracts trading less than this are never flagged, however lopsided the ratios
+MIN_VOLUME = 100
+# Calendar days of stored snapshots averaged into the volume baseline
+BASELINE_DAYS = 20
+
+ACTIVITY_COLUMNS = ["ticker", "contractSymbol", "expiration", "side", "strike", "lastPrice", "volume",
+                    "openInterest", "volume_oi", "baseline_volume", "volume_vs_baseline", "premium", "reasons"]
+
+
+# Mean daily volume per contract over the stored snapshots of the previous
+# BASELINE_DAYS days (today excluded). Snapshot volume is cumulative within a day,
+# so each day counts with its last (largest) reading. Empty without a store.
+def volume_baseline(tickers, days=BASELINE_DAYS, now=None):
+    # Imported here so pyarrow is only loaded when a scan asks for history
+    import snapshot_store
+
+    store = snapshot_store.default_store()
+    if store is None or not tickers:
+        return pd.Series(dtype=np.float64, name="baseline_volume")
+    now = now or datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    history = store.read(ticker=list(tickers), start=today - timedelta(days=days),
+                         end=today - timedelta(microseconds=1), columns=["contractSymbol", "date", "volume"])
+    if history.empty:
+        return pd.Series(dtype=np.float64, name="baseline_volume")
+    daily = history.groupby(["contractSymbol", "date"], observed=True)["volume"].max()
+    return daily.groupby(level="contractSymbol", observed=True).mean().rename("baseline_volume")
+
+
+# Flag unusual contracts in one concatenated frame (chain rows plus ticker,
+# expiration and is_call columns), all tests vectorized over every row at once.
+# baseline is volume_baseline's Series; contracts missing from it skip that test.
+def flag_unusual(frame, baseline=None, volume_oi_ratio=VOLUME_OI_RATIO,
+                 baseline_multiple=BASELINE_MULTIPLE, min_premium=MIN_PREMIUM, min_volume=MIN_VOLUME):
+    volume = np.nan_to_num(frame["volume"].to_numpy(dtype=np.float64))
+    open_interest = np.nan_to_num(frame["openInterest"].to_numpy(dtype=np.float64))
+    last_price = np.nan_to_num(frame["lastPrice"].to_numpy(dtype=np.float64))
+    if baseline is None or baseline.empty:
+        baseline_volume = np.full(len(frame), np.nan)
+    else:
+        baseline_volume = frame["contractSymbol"].map(baseline).to_numpy(dtype=np.float64)
+
+    # Fresh contracts with no open interest yet count as one contract of OI
+    volume_oi = volume / np.maximum(open_interest, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_vs_baseline = np.where(baseline_volume > 0, volume / baseline_volume, np.nan)
+    premium = put_call.premium(volume, last_price)
+
+    active = volume >= min_volume
+    by_oi = active & (volume_oi > volume_oi_ratio)
+    by_baseline = active & (volume_vs_baseline > baseline_multiple)
+    by_premium = active & (premium > min_premium)
+    flagged = by_oi | by_baseline | by_premium
+
+    reasons = np.full(len(frame), "", dtype=object)
+    for mask, label in ((by_oi, "volume/OI"), (by_baseline, "vs baseline"), (by_premium, "premium")):
+        reasons[mask] = np.where(reasons[mask] == "", label, reasons[mask] + ", " + label)
+
+    result = frame.assign(
+        side=np.where(frame["is_call"].to_numpy(dtype=bool), "call", "put"),
+        volume_oi=volume_oi, baseline_volume=baseline_volume,
+        volume_vs_baseline=volume_vs_baseline, premium=premium, reasons=reasons,
+    )[flagged]
+    return result.reindex(columns=ACTIVITY_COLUMNS).sort_values("premium", ascending=False, ignore_index=True)
+
+
+# Flag the whole market in a single pass over per-ticker chain frames that were
+# already fetched (watchlist.scan_watchlist with_frames), against the tickers' baselines
+def flag_frames(frames, tickers, **thresholds):
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=ACTIVITY_COLUMNS)
+    everything = pd.concat(frames, ignore_index=True)
+    return flag_unusual(everything, volume_baseline(tickers), **thresholds)
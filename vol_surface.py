@@ -0,0 +1,144 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import greeks
+import market_data
+from cache import TTLCache
+
+# Log-moneyness ln(K/S) range and resolution of the displayed grid
+MONEYNESS_RANGE = (-0.4, 0.4)
+MONEYNESS_POINTS = 41
+EXPIRY_POINTS = 30
+
+# Quotes outside these bounds are treated as bad prints
+MIN_IV = 0.01
+MAX_IV = 5.0
+
+# points: the cleaned per-contract quotes the grid was built from.
+# iv[i, j] is the volatility at time grid t[i] and log-moneyness grid moneyness[j];
+# NaN where no expiry brackets the cell.
+VolSurface = namedtuple("VolSurface", ["ticker", "spot", "moneyness", "t", "iv", "points", "smoothed"])
+
+_surfaces = TTLCache(maxsize=64)
+
+
+# One row per usable out-of-the-money contract across all expiries: calls at or
+# above spot, puts below, which is where the quoted IV is most reliable
+def surface_points(chains, spot, now=None):
+    frames = []
+    for expiration_date, chain in chains.items():
+        for frame, is_call in ((chain.calls, True), (chain.puts, False)):
+            strikes = frame["strike"].to_numpy(dtype=float)
+            otm = strikes >= spot if is_call else strikes < spot
+            frames.append(pd.DataFrame({
+                "expiration": expiration_date,
+                "strike": strikes[otm],
+                "iv": frame["impliedVolatility"].to_numpy(dtype=float)[otm],
+            }))
+    if not frames:
+        return pd.DataFrame(columns=["expiration", "strike", "iv", "t", "moneyness"])
+    points = pd.concat(frames, ignore_index=True)
+    points = points[(points["iv"] > MIN_IV) & (points["iv"] < MAX_IV)]
+    expiries = points["expiration"].unique()
+    t_by_expiry = dict(zip(expiries, np.atleast_1d(greeks.time_to_expiry(list(expiries), now=now))))
+    points = points.assign(t=points["expiration"].map(t_by_expiry).astype(float),
+                           moneyness=np.log(points["strike"].to_numpy() / spot))
+    return points.sort_values(["t", "moneyness"]).reset_index(drop=True)
+
+
+# Raw SVI total variance w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2))
+def svi_total_variance(params, k):
+    a, b, rho, m, sigma = params
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + sigma ** 2))
+
+
+# Candidate (m, sigma) pairs for the SVI fit
+_SVI_M = np.linspace(-0.3, 0.3, 25)
+_SVI_SIGMA = np.geomspace(0.01, 1.0, 20)
+
+
+# Quasi-explicit SVI fit: for fixed (m, sigma) the model is linear in
+# (a, b * rho, b), so all candidate pairs are solved at once as a batch of 3x3
+# least-squares systems and the best admissible one (b >= 0, |rho| < 1,
+# non-negative minimum variance) wins. No iterative optimizer is needed.
+# Returns None when no candidate is admissible (e.g. very noisy quotes).
+def fit_svi(k, w):
+    m, sigma = (x.ravel() for x in np.meshgrid(_SVI_M, _SVI_SIGMA))
+    x = k[None, :] - m[:, None]
+    design = np.stack([np.ones_like(x), x, np.sqrt(x * x + sigma[:, None] ** 2)], axis=-1)
+    gram = np.einsum("cni,cnj->cij", design, design) + 1e-12 * np.eye(3)
+    coef = np.linalg.solve(gram, np.einsum("cni,n->ci", design, w)[..., None])[..., 0]
+    a, b_rho, b = coef.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho = b_rho / b
+    residual = np.einsum("cni,ci->cn", design, coef) - w
+    sse = np.einsum("cn,cn->c", residual, residual)
+    admissible = (b >= 0) & (np.abs(rho) < 1) & (a + b * sigma * np.sqrt(np.maximum(1 - rho * rho, 0)) >= 0)
+    if not admissible.any():
+        return None
+    best = np.flatnonzero(admissible)[np.argmin(sse[admissible])]
+    return a[best], b[best], rho[best], m[best], sigma[best]
+
+
+# Total variance of every expiry on the moneyness grid. Raw quotes are linearly
+# interpolated (NaN outside the quoted strikes); SVI-smoothed slices are
+# evaluated across the whole grid, falling back to raw when the fit fails.
+def _slices(points, grid, smooth):
+    expiry_t = []
+    rows = []
+    for t, group in points.groupby("t", sort=True):
+        k = group["moneyness"].to_numpy()
+        w = group["iv"].to_numpy() ** 2 * t
+        params = fit_svi(k, w) if smooth and len(k) >= 5 else None
+        if params is not None:
+            rows.append(np.maximum(svi_total_variance(params, grid), 0.0))
+        elif len(k) >= 2:
+            rows.append(np.interp(grid, k, w, left=np.nan, right=np.nan))
+        else:
+            continue
+        expiry_t.append(t)
+    return np.array(expiry_t), np.array(rows).reshape(len(rows), len(grid))
+
+
+# Interpolate total variance linearly in time for every grid column at once and
+# convert back to volatility
+def _interpolate_in_time(expiry_t, variance, t_grid):
+    upper = np.clip(np.searchsorted(expiry_t, t_grid), 1, len(expiry_t) - 1)
+    lower = upper - 1
+    weight = ((t_grid - expiry_t[lower]) / (expiry_t[upper] - expiry_t[lower]))[:, None]
+    total = variance[lower] * (1 - weight) + variance[upper] * weight
+    with np.errstate(invalid="ignore"):
+        return np.sqrt(np.maximum(total, 0.0) / t_grid[:, None])
+
+
+def build_surface(ticker, chains, spot, smooth=False, now=None):
+    points = surface_points(chains, spot, now=now)
+    grid = np.linspace(*MONEYNESS_RANGE, MONEYNESS_POINTS)
+    expiry_t, variance = _slices(points, grid, smooth)
+    if len(expiry_t) < 2:
+        raise ValueError(f"Need at least two expirations with usable quotes to build a surface for {ticker}")
+    t_grid = np.linspace(expiry_t[0], expiry_t[-1], EXPIRY_POINTS)
+    iv = _interpolate_in_time(expiry_t, variance, t_grid)
+    return VolSurface(ticker, spot, grid, t_grid, iv, points, smooth)
+
+
+# Fitted surface for a ticker, rebuilt from the (cached) chains once the chain TTL lapses
+def get_surface(ticker, smooth=False):
+    ticker = market_data.normalize_ticker(ticker)
+    key = (ticker, smooth)
+    surface = _surfaces.get(key)
+    if surface is None:
+        expiration_dates = market_data.get_options(ticker)
+        chains, _ = market_data.fetch_option_chains(ticker, expiration_dates)
+        surface = build_surface(ticker, chains, market_data.get_spot(ticker), smooth=smooth)
+        _surfaces.set(key, surface, market_data.TTLS["option_chain"])
+    return surface
+
+
+# Surface grid as a DataFrame: one row per days-to-expiry, one column per strike/spot ratio
+def surface_frame(surface):
+    return pd.DataFrame(surface.iv,
+                        index=pd.Index(np.round(surface.t * greeks.DAYS_PER_YEAR, 1), name="days"),
+                        columns=pd.Index(np.round(np.exp(surface.moneyness), 3), name="strike/spot"))
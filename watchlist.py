@@ -0,0 +1,108 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+import market_data
+import put_call
+import scheduler
+
+MAX_WORKERS = 8
+# Tickers started per second across the whole scan, to stay clear of provider throttling
+RATE_PER_SECOND = 4.0
+
+SUMMARY_COLUMNS = ["ticker", "last_price", "put_call_ratio", "top_contract", "top_volume",
+                   "atm_iv", "expirations", "error"]
+
+
+# Split pasted text on commas, whitespace or newlines; normalized, de-duplicated, in order
+def parse_tickers(text):
+    seen = {}
+    for token in re.split(r"[\s,;]+", text):
+        if token.strip():
+            seen.setdefault(market_data.normalize_ticker(token), None)
+    return list(seen)
+
+
+# Spaces out calls so at most rate_per_second of them start each second
+class RateLimiter:
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# Average of call and put IV at the strike nearest spot
+def _atm_iv(chain, spot):
+    ivs = []
+    for frame in (chain.calls, chain.puts):
+        if not frame.empty:
+            nearest = np.abs(frame["strike"].to_numpy(dtype=float) - spot).argmin()
+            ivs.append(float(frame["impliedVolatility"].iloc[nearest]))
+    return float(np.mean(ivs)) if ivs else None
+
+
+# Summary stats for one ticker over its nearest max_expiries expirations (all when
+# None), plus the chains they were computed from ({} when the ticker failed)
+def _summarize(ticker, max_expiries):
+    ticker = market_data.normalize_ticker(ticker)
+    summary = dict.fromkeys(SUMMARY_COLUMNS)
+    summary["ticker"] = ticker
+    chains = {}
+    try:
+        spot = market_data.get_spot(ticker)
+        summary["last_price"] = spot
+        expiration_dates = market_data.get_options(ticker)[:max_expiries]
+        chains, _ = market_data.fetch_option_chains(ticker, expiration_dates)
+        summary["expirations"] = len(chains)
+        if chains:
+            summary["put_call_ratio"] = put_call.volume_ratio(chains)
+            summary["atm_iv"] = _atm_iv(next(iter(chains.values())), spot)
+            best_volume = -1.0
+            for chain in chains.values():
+                for frame in (chain.calls, chain.puts):
+                    volume = frame["volume"].fillna(0)
+                    if len(volume) and volume.max() > best_volume:
+                        best_volume = float(volume.max())
+                        summary["top_contract"] = frame["contractSymbol"].iloc[int(volume.to_numpy().argmax())]
+            summary["top_volume"] = best_volume if best_volume >= 0 else None
+    except Exception as e:
+        summary["error"] = str(e)
+    return summary, chains
+
+
+# Summarize many tickers on a bounded worker pool, yielding (summary, frame) as
+# soon as each ticker completes (completion order, not input order). With
+# with_frames, frame is the ticker's chains as one chain_frame with a ticker column,
+# so cross-market analytics reuse them instead of fetching again; otherwise None.
+def scan_watchlist(tickers, max_workers=MAX_WORKERS, rate_per_second=RATE_PER_SECOND, max_expiries=None,
+                   with_frames=False):
+    limiter = RateLimiter(rate_per_second)
+
+    def run(ticker):
+        limiter.wait()
+        with scheduler.background():
+            summary, chains = _summarize(ticker, max_expiries)
+        if not with_frames or summary["error"]:
+            return summary, None
+        return summary, market_data.chain_frame(chains).assign(ticker=summary["ticker"])
+
+    # Shut down without waiting, so a consumer that stops early (a Streamlit rerun
+    # mid-scan) is not blocked until every queued ticker has been fetched
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [pool.submit(run, ticker) for ticker in tickers]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)